@@ -1,24 +1,30 @@
 import pygame
 import sys
+import os
 import random
+import argparse
 
-# Initialize Pygame
-pygame.init()
+# The shared text cache lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_cache
 
 # Screen dimensions
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 600
 
-# Create the window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Flappy Bird by ChatGPT')
-
 # Game variables
 GRAVITY = 0.5
 BIRD_JUMP = -10
 PIPE_SPEED = 3
 PIPE_GAP = 150
 
+# The game variables above are per tick of the base physics rate; running
+# physics faster scales each step down so the game plays the same
+BASE_PHYSICS_HZ = 60
+FPS = 60
+# Longest frame the fixed-timestep loop catches up on, in milliseconds
+MAX_FRAME_TIME = 250
+
 # Load images
 bird_image = pygame.Surface((34, 24))
 bird_image.fill((255, 255, 0))  # Yellow bird
@@ -27,9 +33,23 @@ pipe_width = 52
 pipe_height = SCREEN_HEIGHT
 pipe_image = pygame.Surface((pipe_width, pipe_height))
 pipe_image.fill((0, 255, 0))  # Green pipes
+top_pipe_image = pygame.transform.flip(pipe_image, False, True)
+
+# A new pipe pair spawns once the pipe timer reaches this many base ticks
+# (flappy_env.py uses the same interval)
+PIPE_INTERVAL = 91
+# Pipe pairs that can be on screen at once, plus one spare
+PIPE_POOL_SIZE = (SCREEN_WIDTH + pipe_width) // (PIPE_SPEED * PIPE_INTERVAL) + 2
+
+# Window is created by init_display()
+screen = None
 
-# Fonts
-font = pygame.font.SysFont('Arial', 32)
+def init_display():
+    """Create the window used by the windowed game."""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Flappy Bird by ChatGPT')
 
 class Bird:
     """Class representing the bird."""
@@ -38,38 +58,84 @@ class Bird:
         self.rect = self.image.get_rect()
         self.rect.center = (50, SCREEN_HEIGHT // 2)
         self.velocity = 0
+        self.y = self.prev_y = self.rect.y
 
-    def update(self):
-        """Update the bird's position."""
-        self.velocity += GRAVITY
-        self.rect.y += int(self.velocity)
+    def update(self, dt=1):
+        """Update the bird's position; dt is the step length in base ticks."""
+        self.prev_y = self.y
+        self.velocity += GRAVITY * dt
+        self.y += int(self.velocity) * dt
+        self.rect.y = int(self.y)
 
     def jump(self):
         """Make the bird jump."""
         self.velocity = BIRD_JUMP
 
-    def draw(self, surface):
-        """Draw the bird on the screen."""
-        surface.blit(self.image, self.rect)
+    def draw(self, surface, alpha=1):
+        """Draw the bird, alpha of the way from its previous position to the current one."""
+        surface.blit(self.image, (self.rect.x, self.prev_y + (self.y - self.prev_y) * alpha))
 
 class Pipe:
     """Class representing a pipe."""
     def __init__(self, x, y, flipped):
-        self.image = pipe_image
+        self.flipped = flipped
+        self.image = top_pipe_image if flipped else pipe_image
         self.rect = self.image.get_rect()
-        if flipped:
-            self.image = pygame.transform.flip(self.image, False, True)
+        self.place(x, y)
+
+    def place(self, x, y):
+        """Move the pipe to x with its edge beside a gap centred on y."""
+        if self.flipped:
             self.rect.bottomleft = (x, y - PIPE_GAP // 2)
         else:
             self.rect.topleft = (x, y + PIPE_GAP // 2)
+        self.x = self.prev_x = x
 
-    def update(self):
+    def update(self, dt=1):
         """Move the pipe to the left."""
-        self.rect.x -= PIPE_SPEED
+        self.prev_x = self.x
+        self.x -= PIPE_SPEED * dt
+        self.rect.x = int(self.x)
+
+    def draw(self, surface, alpha=1):
+        """Draw the pipe, alpha of the way from its previous position to the current one."""
+        surface.blit(self.image, (self.prev_x + (self.x - self.prev_x) * alpha, self.rect.y))
+
+class PipePool:
+    """Fixed ring of reusable pipe pairs.
+
+    Pipes only ever leave off the left edge in the order they spawned, so a
+    spawn reuses the slot after the newest pair and retiring just advances
+    the head of the ring. Iterating yields the active pipes, oldest first.
+    """
+    def __init__(self, capacity=PIPE_POOL_SIZE):
+        self.pairs = [(Pipe(0, 0, True), Pipe(0, 0, False)) for _ in range(capacity)]
+        self.head = 0
+        self.count = 0
 
-    def draw(self, surface):
-        """Draw the pipe on the screen."""
-        surface.blit(self.image, self.rect)
+    def __len__(self):
+        return 2 * self.count
+
+    def __iter__(self):
+        pairs = self.pairs
+        for i in range(self.count):
+            yield from pairs[(self.head + i) % len(pairs)]
+
+    def spawn(self, x, y):
+        if self.count == len(self.pairs):
+            self.retire()
+        top, bottom = self.pairs[(self.head + self.count) % len(self.pairs)]
+        top.place(x, y)
+        bottom.place(x, y)
+        self.count += 1
+
+    def retire(self):
+        """Drop the oldest pair."""
+        self.head = (self.head + 1) % len(self.pairs)
+        self.count -= 1
+
+    def oldest(self):
+        return self.pairs[self.head][0] if self.count else None
 
 def check_collision(bird, pipes):
     """Check for collision between the bird and pipes."""
@@ -82,63 +148,106 @@ def check_collision(bird, pipes):
 
 def display_text(surface, text, x, y):
     """Display text on the screen."""
-    label = font.render(text, True, (255, 255, 255))
+    label = text_cache.render(text, 'Arial', 32, (255, 255, 255))
     surface.blit(label, (x, y))
 
-def main():
-    """Main game loop."""
+class FlappyGame:
+    """Flappy Bird state that can be advanced with or without a window.
+
+    Each step() is one physics tick of 1 / physics_hz seconds.
+    """
+    def __init__(self, seed=None, physics_hz=BASE_PHYSICS_HZ):
+        self.rng = random.Random(seed)
+        self.physics_hz = physics_hz
+        self.dt = BASE_PHYSICS_HZ / physics_hz
+        self.bird = Bird()
+        self.pipes = PipePool()
+        self.pipe_timer = 0
+        self.score = 0
+        self.frame = 0
+        self.over = False
+
+    def step(self, jump=False):
+        """Advance one physics tick, flapping first if jump is set."""
+        self.frame += 1
+        if jump:
+            self.bird.jump()
+
+        # Update bird
+        self.bird.update(self.dt)
+
+        # Update pipes
+        # The timer counts physics ticks; compared in whole numbers so that
+        # PIPE_INTERVAL base ticks pass exactly at any physics rate
+        self.pipe_timer += 1
+        if self.pipe_timer * BASE_PHYSICS_HZ >= PIPE_INTERVAL * self.physics_hz:
+            pipe_y = self.rng.randint(100, SCREEN_HEIGHT - 100)
+            self.pipes.spawn(SCREEN_WIDTH, pipe_y)
+            self.pipe_timer = 0
+
+        for pipe in self.pipes:
+            pipe.update(self.dt)
+        while self.pipes.count and self.pipes.oldest().rect.right < 0:
+            self.pipes.retire()
+            self.score += 1  # Each pair of pipes passed adds 1 to the score
+
+        # Check for collisions
+        if check_collision(self.bird, self.pipes):
+            self.over = True
+
+    def draw(self, surface, alpha=1):
+        """Draw the bird, the pipes and the score, interpolated alpha of the way into the last tick."""
+        surface.fill((0, 0, 255))  # Blue background
+        self.bird.draw(surface, alpha)
+        for pipe in self.pipes:
+            pipe.draw(surface, alpha)
+        display_text(surface, f"Score: {int(self.score)}", 10, 10)
+
+def run_headless(policy, max_frames=100000, seed=None, physics_hz=BASE_PHYSICS_HZ):
+    """Play a game without a window; policy(game) returns whether to flap."""
+    game = FlappyGame(seed, physics_hz)
+    while not game.over and game.frame < max_frames:
+        game.step(policy(game))
+    return game
+
+def play(physics_hz=BASE_PHYSICS_HZ, fps=FPS):
+    """Play one round and return its score.
+
+    Physics runs in fixed ticks of 1 / physics_hz seconds, as many per frame
+    as the elapsed time calls for, and each frame is drawn interpolated
+    between the last two ticks. fps=0 leaves the frame rate uncapped.
+    """
     clock = pygame.time.Clock()
-    bird = Bird()
-    pipes = []
-    pipe_timer = 0
-    score = 0
+    game = FlappyGame(physics_hz=physics_hz)
+    tick_time = 1000 / physics_hz
+    accumulator = 0
+    jump = False
 
-    running = True
-    while running:
-        clock.tick(60)  # 60 FPS
+    while not game.over:
+        accumulator += min(clock.tick(fps), MAX_FRAME_TIME)
 
-        # Event handling
+        # Event handling; a flap waits for the next physics tick
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                running = False
+                text_cache.clear()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    bird.jump()
-
-        # Update bird
-        bird.update()
-
-        # Update pipes
-        pipe_timer += 1
-        if pipe_timer > 90:
-            pipe_y = random.randint(100, SCREEN_HEIGHT - 100)
-            top_pipe = Pipe(SCREEN_WIDTH, pipe_y, True)
-            bottom_pipe = Pipe(SCREEN_WIDTH, pipe_y, False)
-            pipes.append(top_pipe)
-            pipes.append(bottom_pipe)
-            pipe_timer = 0
-
-        for pipe in pipes:
-            pipe.update()
-            if pipe.rect.right < 0:
-                pipes.remove(pipe)
-                score += 0.5  # Each pair of pipes passed adds 1 to the score
+                    jump = True
 
-        # Check for collisions
-        if check_collision(bird, pipes):
-            break  # End the game
+        while accumulator >= tick_time and not game.over:
+            game.step(jump)
+            jump = False
+            accumulator -= tick_time
 
         # Draw everything
-        screen.fill((0, 0, 255))  # Blue background
-        bird.draw(screen)
-        for pipe in pipes:
-            pipe.draw(screen)
-        display_text(screen, f"Score: {int(score)}", 10, 10)
+        game.draw(screen, accumulator / tick_time)
         pygame.display.update()
+    return game.score
 
-    # Game over screen
+def game_over_screen(score):
+    """Show the final score until the player restarts with R or quits."""
     while True:
         screen.fill((0, 0, 0))
         display_text(screen, "Game Over", SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2 - 50)
@@ -148,15 +257,28 @@ def main():
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                text_cache.clear()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    main()
+                    return
                 if event.key == pygame.K_q:
+                    text_cache.clear()
                     pygame.quit()
                     sys.exit()
 
+def main(physics_hz=BASE_PHYSICS_HZ, fps=FPS):
+    """Alternate between rounds and the game over screen until the player quits."""
+    while True:
+        score = play(physics_hz, fps)
+        game_over_screen(score)
+
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Flappy Bird')
+    parser.add_argument('--physics-hz', type=int, default=BASE_PHYSICS_HZ, help='physics ticks per second')
+    parser.add_argument('--fps', type=int, default=FPS, help='frame rate cap, 0 for uncapped')
+    args = parser.parse_args()
+    init_display()
+    main(args.physics_hz, args.fps)
 
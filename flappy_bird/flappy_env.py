@@ -0,0 +1,106 @@
+import numpy as np
+
+from flappy_bird import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY, BIRD_JUMP, PIPE_SPEED, PIPE_GAP,
+    PIPE_INTERVAL, PIPE_POOL_SIZE, bird_image, pipe_width,
+)
+
+# Bird geometry, matching Bird in flappy_bird.py
+BIRD_WIDTH, BIRD_HEIGHT = bird_image.get_size()
+BIRD_X = 50 - BIRD_WIDTH // 2
+BIRD_START_Y = SCREEN_HEIGHT // 2 - BIRD_HEIGHT // 2
+
+# Observation columns: bird y, bird velocity, distance to next pipe, next gap centre
+OBS_SIZE = 4
+
+class FlappyVecEnv:
+    """N independent Flappy Bird games stepped in lockstep on NumPy arrays."""
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.bird_y = np.zeros(num_envs)
+        self.velocity = np.zeros(num_envs)
+        # One ring of pipe slots per environment
+        self.pipe_x = np.zeros((num_envs, PIPE_POOL_SIZE))
+        self.gap_y = np.zeros((num_envs, PIPE_POOL_SIZE))
+        self.pipe_active = np.zeros((num_envs, PIPE_POOL_SIZE), dtype=bool)
+        self.next_slot = np.zeros(num_envs, dtype=np.int64)
+        self.pipe_timer = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.frame = np.zeros(num_envs, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset every environment, or only those selected by a boolean mask."""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.bird_y[mask] = BIRD_START_Y
+        self.velocity[mask] = 0
+        self.pipe_active[mask] = False
+        self.next_slot[mask] = 0
+        self.pipe_timer[mask] = 0
+        self.score[mask] = 0
+        self.frame[mask] = 0
+        return self.observe()
+
+    def step(self, actions):
+        """Advance all environments one frame.
+
+        actions is a length-N array where a truthy entry makes that bird flap.
+        Returns (obs, rewards, dones, info). Finished environments are reset
+        immediately; their final scores are in info['final_score'].
+        """
+        envs = np.arange(self.num_envs)
+        self.frame += 1
+
+        # Update birds
+        self.velocity = np.where(np.asarray(actions, dtype=bool), BIRD_JUMP, self.velocity)
+        self.velocity += GRAVITY
+        self.bird_y += np.trunc(self.velocity)
+
+        # Spawn pipes into the next ring slot
+        self.pipe_timer += 1
+        spawn = self.pipe_timer >= PIPE_INTERVAL
+        if spawn.any():
+            rows = envs[spawn]
+            slots = self.next_slot[spawn]
+            self.pipe_x[rows, slots] = SCREEN_WIDTH
+            self.gap_y[rows, slots] = self.rng.integers(100, SCREEN_HEIGHT - 100, size=rows.size, endpoint=True)
+            self.pipe_active[rows, slots] = True
+            self.next_slot[spawn] = (slots + 1) % PIPE_POOL_SIZE
+            self.pipe_timer[spawn] = 0
+
+        # Move pipes and retire the ones that left the screen
+        self.pipe_x -= PIPE_SPEED
+        passed = self.pipe_active & (self.pipe_x + pipe_width < 0)
+        self.pipe_active &= ~passed
+        rewards = passed.sum(axis=1)
+        self.score += rewards
+
+        # Check for collisions against every pipe of every environment at once
+        top = self.bird_y[:, None]
+        bottom = top + BIRD_HEIGHT
+        overlap_x = (self.pipe_x < BIRD_X + BIRD_WIDTH) & (self.pipe_x + pipe_width > BIRD_X)
+        in_pipe = (top < self.gap_y - PIPE_GAP // 2) | (bottom > self.gap_y + PIPE_GAP // 2)
+        hit_pipe = (self.pipe_active & overlap_x & in_pipe).any(axis=1)
+        hit_edge = (self.bird_y <= 0) | (self.bird_y + BIRD_HEIGHT >= SCREEN_HEIGHT)
+        dones = hit_pipe | hit_edge
+
+        info = {'final_score': np.where(dones, self.score, 0), 'final_frame': np.where(dones, self.frame, 0)}
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones, info
+
+    def observe(self):
+        """Return an (N, OBS_SIZE) array describing each bird and its next pipe."""
+        ahead = self.pipe_active & (self.pipe_x + pipe_width >= BIRD_X)
+        distance = np.where(ahead, self.pipe_x - BIRD_X, np.inf)
+        nearest = distance.argmin(axis=1)
+        has_pipe = ahead.any(axis=1)
+        envs = np.arange(self.num_envs)
+        obs = np.empty((self.num_envs, OBS_SIZE), dtype=np.float32)
+        obs[:, 0] = self.bird_y
+        obs[:, 1] = self.velocity
+        obs[:, 2] = np.where(has_pipe, distance[envs, nearest], SCREEN_WIDTH)
+        obs[:, 3] = np.where(has_pipe, self.gap_y[envs, nearest], SCREEN_HEIGHT // 2)
+        return obs
@@ -1,9 +1,13 @@
 import pygame
+import sys
+import os
 import time
 import random
+from collections import deque
 
-# Initialize Pygame
-pygame.init()
+# The shared text cache lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_cache
 
 # Define colors
 white = (255, 255, 255)
@@ -17,24 +21,38 @@ blue = (50, 153, 213)
 dis_width = 600
 dis_height = 400
 
-# Create the display window
-dis = pygame.display.set_mode((dis_width, dis_height))
-pygame.display.set_caption('Snake Game by ChatGPT')
-
-# Set up the clock for controlling the game's frame rate
-clock = pygame.time.Clock()
-
 # Set snake's block size and speed
 snake_block = 10
 snake_speed = 15
 
-# Set up fonts for displaying score and messages
-font_style = pygame.font.SysFont(None, 30)
-score_font = pygame.font.SysFont(None, 35)
+# Board size in cells
+GRID_WIDTH = dis_width // snake_block
+GRID_HEIGHT = dis_height // snake_block
+
+# Keyboard bindings for the snake's directions
+KEY_ACTIONS = {
+    pygame.K_LEFT: 'left',
+    pygame.K_RIGHT: 'right',
+    pygame.K_UP: 'up',
+    pygame.K_DOWN: 'down',
+}
+
+# Display window and clock are created by init_display()
+dis = None
+clock = None
+
+def init_display():
+    """Create the window and clock used by the windowed game."""
+    global dis, clock
+    pygame.init()
+    dis = pygame.display.set_mode((dis_width, dis_height))
+    pygame.display.set_caption('Snake Game by ChatGPT')
+    # Set up the clock for controlling the game's frame rate
+    clock = pygame.time.Clock()
 
 def Your_score(score):
     """Display the current score on the screen."""
-    value = score_font.render("Your Score: " + str(score), True, yellow)
+    value = text_cache.render("Your Score: " + str(score), None, 35, yellow)
     dis.blit(value, [0, 0])
 
 def our_snake(snake_block, snake_list):
@@ -44,110 +62,192 @@ def our_snake(snake_block, snake_list):
 
 def message(msg, color):
     """Display a message in the center of the screen."""
-    mesg = font_style.render(msg, True, color)
+    mesg = text_cache.render(msg, None, 30, color)
     dis.blit(mesg, [dis_width / 6, dis_height / 3])
 
-def gameLoop():
-    """Main function containing the game loop."""
-    game_over = False
-    game_close = False
+class SnakeGame:
+    """Snake state that can be advanced with or without a window."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.game_close = False
+        self.frame = 0
+
+        # Starting position of the snake
+        self.x1 = dis_width / 2
+        self.y1 = dis_height / 2
+
+        # Change in position
+        self.x1_change = 0
+        self.y1_change = 0
+
+        # Snake's body, tail first, and how many segments cover each cell
+        self.snake_List = deque()
+        self.occupied = [0] * (GRID_WIDTH * GRID_HEIGHT)
+        self.Length_of_snake = 1
+
+        # Cells no segment covers, and where each cell sits in that list
+        # (-1 while covered), so food placement and updates are O(1)
+        self.free_cells = list(range(GRID_WIDTH * GRID_HEIGHT))
+        self.free_slot = list(range(GRID_WIDTH * GRID_HEIGHT))
+
+        # The head starts on the board
+        self.snake_List.append((self.x1, self.y1))
+        self.cover(self.cell(self.x1, self.y1))
+
+        # Position of the food
+        self.place_food()
+
+    def place_food(self):
+        """Move the food to a random cell the snake does not cover."""
+        if not self.free_cells:
+            # The snake fills the board
+            self.foodx = self.foody = None
+            return
+        cell = self.free_cells[self.rng.randrange(len(self.free_cells))]
+        row, col = divmod(cell, GRID_WIDTH)
+        self.foodx = float(col * snake_block)
+        self.foody = float(row * snake_block)
+
+    def cover(self, cell):
+        """Count a segment on cell; return whether another one was already there."""
+        self.occupied[cell] += 1
+        if self.occupied[cell] > 1:
+            return True
+        # Swap-remove the cell from the free list
+        slot = self.free_slot[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[slot] = last
+            self.free_slot[last] = slot
+        self.free_slot[cell] = -1
+        return False
+
+    def uncover(self, cell):
+        self.occupied[cell] -= 1
+        if not self.occupied[cell]:
+            self.free_slot[cell] = len(self.free_cells)
+            self.free_cells.append(cell)
+
+    def cell(self, x, y):
+        """Index of the grid cell at pixel position (x, y), or None off the board."""
+        col = int(x) // snake_block
+        row = int(y) // snake_block
+        if 0 <= col < GRID_WIDTH and 0 <= row < GRID_HEIGHT and x >= 0 and y >= 0:
+            return row * GRID_WIDTH + col
+        return None
+
+    def score(self):
+        """Return the number of food items eaten."""
+        return self.Length_of_snake - 1
+
+    def step(self, actions=()):
+        """Advance one tick given the direction changes requested this tick."""
+        self.frame += 1
+        for action in actions:
+            if action == 'left':
+                self.x1_change = -snake_block
+                self.y1_change = 0
+            elif action == 'right':
+                self.x1_change = snake_block
+                self.y1_change = 0
+            elif action == 'up':
+                self.y1_change = -snake_block
+                self.x1_change = 0
+            elif action == 'down':
+                self.y1_change = snake_block
+                self.x1_change = 0
 
-    # Starting position of the snake
-    x1 = dis_width / 2
-    y1 = dis_height / 2
+        # Check for boundary collisions
+        if self.x1 >= dis_width or self.x1 < 0 or self.y1 >= dis_height or self.y1 < 0:
+            self.game_close = True
 
-    # Change in position
-    x1_change = 0
-    y1_change = 0
+        # Update the position of the snake's head
+        self.x1 += self.x1_change
+        self.y1 += self.y1_change
 
-    # Snake's body
-    snake_List = []
-    Length_of_snake = 1
+        # Update the snake's body
+        snake_Head = (self.x1, self.y1)
+        self.snake_List.append(snake_Head)
 
-    # Position of the food
-    foodx = round(random.randrange(0, dis_width - snake_block) / 10.0) * 10.0
-    foody = round(random.randrange(0, dis_height - snake_block) / 10.0) * 10.0
+        # Remove the last segment if the snake hasn't grown
+        if len(self.snake_List) > self.Length_of_snake:
+            tail = self.cell(*self.snake_List.popleft())
+            if tail is not None:
+                self.uncover(tail)
+
+        # Check for collisions with itself
+        head = self.cell(*snake_Head)
+        if head is not None and self.cover(head):
+            self.game_close = True
+
+        # Check if the snake has eaten the food
+        if self.x1 == self.foodx and self.y1 == self.foody:
+            self.place_food()
+            self.Length_of_snake += 1
+
+    def draw(self):
+        """Draw the food, the snake and the score."""
+        dis.fill(blue)
+        if self.foodx is not None:
+            pygame.draw.rect(dis, green, [self.foodx, self.foody, snake_block, snake_block])
+        our_snake(snake_block, self.snake_List)
+        Your_score(self.score())
+
+def run_headless(policy, max_frames=100000, seed=None):
+    """Play a game without a window; policy(game) returns each tick's actions."""
+    game = SnakeGame(seed)
+    while not game.game_close and game.frame < max_frames:
+        game.step(policy(game))
+    return game
+
+def gameLoop():
+    """Main function containing the game loop."""
+    game_over = False
+    game = SnakeGame()
 
     while not game_over:
 
-        while game_close == True:
+        while game.game_close == True:
             dis.fill(blue)
             message("You Lost! Press C-Play Again or Q-Quit", red)
-            Your_score(Length_of_snake - 1)
+            Your_score(game.score())
             pygame.display.update()
 
             # Event handling for game over screen
             for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    game_over = True
+                    game.game_close = False
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
                         game_over = True
-                        game_close = False
+                        game.game_close = False
                     if event.key == pygame.K_c:
-                        gameLoop()
+                        # Start a new round; the old one is released
+                        game = SnakeGame()
 
         # Event handling for snake movement
+        actions = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 game_over = True  # Quit the game
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    x1_change = -snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_RIGHT:
-                    x1_change = snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_UP:
-                    y1_change = -snake_block
-                    x1_change = 0
-                elif event.key == pygame.K_DOWN:
-                    y1_change = snake_block
-                    x1_change = 0
+            if event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+                actions.append(KEY_ACTIONS[event.key])
 
-        # Check for boundary collisions
-        if x1 >= dis_width or x1 < 0 or y1 >= dis_height or y1 < 0:
-            game_close = True
-
-        # Update the position of the snake's head
-        x1 += x1_change
-        y1 += y1_change
-        dis.fill(blue)
-
-        # Draw the food
-        pygame.draw.rect(dis, green, [foodx, foody, snake_block, snake_block])
-
-        # Update the snake's body
-        snake_Head = []
-        snake_Head.append(x1)
-        snake_Head.append(y1)
-        snake_List.append(snake_Head)
-
-        # Remove the last segment if the snake hasn't grown
-        if len(snake_List) > Length_of_snake:
-            del snake_List[0]
-
-        # Check for collisions with itself
-        for x in snake_List[:-1]:
-            if x == snake_Head:
-                game_close = True
+        game.step(actions)
 
         # Draw the snake and display the score
-        our_snake(snake_block, snake_List)
-        Your_score(Length_of_snake - 1)
-
+        game.draw()
         pygame.display.update()
 
-        # Check if the snake has eaten the food
-        if x1 == foodx and y1 == foody:
-            foodx = round(random.randrange(0, dis_width - snake_block) / 10.0) * 10.0
-            foody = round(random.randrange(0, dis_height - snake_block) / 10.0) * 10.0
-            Length_of_snake += 1
-
         # Control the speed of the snake
         clock.tick(snake_speed)
 
+    text_cache.clear()
     pygame.quit()
     quit()
 
-# Start the game
-gameLoop()
-
+if __name__ == '__main__':
+    # Start the game
+    init_display()
+    gameLoop()
@@ -0,0 +1,145 @@
+import numpy as np
+
+from snake import dis_width, dis_height, snake_block
+
+# Board size in cells
+GRID_WIDTH = dis_width // snake_block
+GRID_HEIGHT = dis_height // snake_block
+NUM_CELLS = GRID_WIDTH * GRID_HEIGHT
+
+# Action codes: 0 keeps the current direction
+NO_CHANGE, LEFT, RIGHT, UP, DOWN = range(5)
+# Cell step for each action code
+DIRECTION_DX = np.array([0, -1, 1, 0, 0])
+DIRECTION_DY = np.array([0, 0, 0, -1, 1])
+
+# Food cell of a game whose snake covers the whole board
+NO_FOOD = -1
+
+# Random food draws tried before falling back to an exact free-cell pick
+FOOD_TRIES = 8
+
+# Observation columns: head x, head y, food x, food y, direction, length
+OBS_SIZE = 6
+
+class SnakeBatch:
+    """Many Snake games stepped simultaneously on NumPy arrays.
+
+    Each body is a ring buffer of cell indices (y * GRID_WIDTH + x) and each
+    board keeps an occupancy grid, so movement, wall and self collision and
+    food consumption are array operations across every game at once. A move
+    off the board ends that game on the same tick.
+    """
+    def __init__(self, num_games, seed=None):
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.games = np.arange(num_games)
+        self.body = np.zeros((num_games, NUM_CELLS), dtype=np.int32)
+        self.head = np.zeros(num_games, dtype=np.int64)  # ring index of the head
+        self.length = np.zeros(num_games, dtype=np.int64)
+        self.occupancy = np.zeros((num_games, NUM_CELLS), dtype=bool)
+        self.direction = np.zeros(num_games, dtype=np.int64)
+        self.head_x = np.zeros(num_games, dtype=np.int64)
+        self.head_y = np.zeros(num_games, dtype=np.int64)
+        self.food = np.zeros(num_games, dtype=np.int64)
+        self.score = np.zeros(num_games, dtype=np.int64)
+        self.steps = np.zeros(num_games, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset every game, or only those selected by a boolean mask."""
+        if mask is None:
+            mask = np.ones(self.num_games, dtype=bool)
+        games = self.games[mask]
+        start = (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 2
+        self.occupancy[games] = False
+        self.occupancy[games, start] = True
+        self.body[games, 0] = start
+        self.head[games] = 0
+        self.length[games] = 1
+        self.direction[games] = NO_CHANGE
+        self.head_x[games] = GRID_WIDTH // 2
+        self.head_y[games] = GRID_HEIGHT // 2
+        self.score[games] = 0
+        self.steps[games] = 0
+        self.place_food(games)
+        return self.observe()
+
+    def place_food(self, games):
+        """Put food on a free cell of each listed game."""
+        pending = games
+        for _ in range(FOOD_TRIES):
+            if not pending.size:
+                return
+            cells = self.rng.integers(0, NUM_CELLS, size=pending.size)
+            free = ~self.occupancy[pending, cells]
+            self.food[pending[free]] = cells[free]
+            pending = pending[~free]
+        if pending.size:
+            # Crowded boards: pick uniformly among the free cells directly;
+            # a board the snake fills completely gets no food (NO_FOOD)
+            keys = self.rng.random((pending.size, NUM_CELLS))
+            keys[self.occupancy[pending]] = -1
+            cells = keys.argmax(axis=1)
+            self.food[pending] = np.where(keys[np.arange(pending.size), cells] < 0, NO_FOOD, cells)
+
+    def step(self, actions):
+        """Advance every game one tick.
+
+        actions is a length-N array of action codes. Returns (obs, rewards,
+        dones, info); finished games are reset immediately and their final
+        scores are in info['final_score'].
+        """
+        actions = np.asarray(actions)
+        self.direction = np.where(actions != NO_CHANGE, actions, self.direction)
+        moving = self.direction != NO_CHANGE
+        self.steps += 1
+
+        new_x = self.head_x + DIRECTION_DX[self.direction]
+        new_y = self.head_y + DIRECTION_DY[self.direction]
+        off_board = (new_x < 0) | (new_x >= GRID_WIDTH) | (new_y < 0) | (new_y >= GRID_HEIGHT)
+        new_cell = np.clip(new_y, 0, GRID_HEIGHT - 1) * GRID_WIDTH + np.clip(new_x, 0, GRID_WIDTH - 1)
+        eats = moving & ~off_board & (new_cell == self.food)
+
+        # Free the tail of every moving snake that is not growing
+        shrink = self.games[moving & ~eats]
+        tail = (self.head[shrink] - self.length[shrink] + 1) % NUM_CELLS
+        self.occupancy[shrink, self.body[shrink, tail]] = False
+
+        hits_self = moving & self.occupancy[self.games, new_cell]
+        dones = moving & (off_board | hits_self)
+
+        # Push the new head for every snake still alive
+        alive = self.games[moving & ~dones]
+        self.head[alive] = (self.head[alive] + 1) % NUM_CELLS
+        self.body[alive, self.head[alive]] = new_cell[alive]
+        self.occupancy[alive, new_cell[alive]] = True
+        self.head_x[alive] = new_x[alive]
+        self.head_y[alive] = new_y[alive]
+
+        # Grow and respawn food
+        fed = self.games[eats & ~dones]
+        self.length[fed] += 1
+        self.score[fed] += 1
+        self.place_food(fed)
+
+        rewards = (eats & ~dones).astype(np.int64)
+        info = {'final_score': np.where(dones, self.score, 0), 'final_steps': np.where(dones, self.steps, 0)}
+        if dones.any():
+            self.reset(dones)
+        return self.observe(), rewards, dones, info
+
+    def observe(self):
+        """Return an (N, OBS_SIZE) array of head, food, direction and length.
+
+        Food x and y are NO_FOOD for a game without food.
+        """
+        obs = np.empty((self.num_games, OBS_SIZE), dtype=np.int64)
+        obs[:, 0] = self.head_x
+        obs[:, 1] = self.head_y
+        has_food = self.food != NO_FOOD
+        obs[:, 2] = np.where(has_food, self.food % GRID_WIDTH, NO_FOOD)
+        obs[:, 3] = np.where(has_food, self.food // GRID_WIDTH, NO_FOOD)
+        obs[:, 4] = self.direction
+        obs[:, 5] = self.length
+        return obs
@@ -2,27 +2,37 @@ import pygame
 import sys
 import os
 import random
+import concurrent.futures
+import hashlib
+import json
+import time
 
-# Initialize Pygame
-pygame.init()
+import solver
 
 # Screen dimensions
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Klondike Solitaire')
 
 # Define colors
 GREEN = (0, 128, 0)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
+HINT_COLOR = (255, 215, 0)
 
 # Card dimensions
 CARD_WIDTH = 72
 CARD_HEIGHT = 96
 
-# Load card images
-def load_card_images():
+# Card image locations
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARD_DIR = os.path.join(BASE_DIR, 'playingcards', 'PNG-cards-1.3')
+# Decoded and scaled cards are cached as one sprite sheet plus an index
+ATLAS_PATH = os.path.join(BASE_DIR, 'playingcards', 'card_atlas.png')
+ATLAS_INDEX_PATH = os.path.join(BASE_DIR, 'playingcards', 'card_atlas.json')
+ATLAS_COLUMNS = 13
+
+def card_sources():
+    """Map card keys such as 'QH' to their PNG files."""
     suits = {
         'spades': 'S',
         'hearts': 'H',
@@ -44,10 +54,8 @@ def load_card_images():
         'queen': 'Q',
         'king': 'K'
     }
-    images = {}
-    # Directory containing your card images
-    card_dir = 'playingcards/PNG-cards-1.3'
-    for filename in os.listdir(card_dir):
+    sources = {}
+    for filename in sorted(os.listdir(CARD_DIR)):
         if filename.endswith('.png'):
             # Extract rank and suit from filename
             name_parts = filename[:-4].split('_of_')
@@ -56,11 +64,59 @@ def load_card_images():
                 rank = ranks.get(rank_name)
                 suit = suits.get(suit_name)
                 if rank and suit:
-                    key = f'{rank}{suit}'
-                    filepath = os.path.join(card_dir, filename)
-                    image = pygame.image.load(filepath).convert_alpha()
-                    image = pygame.transform.scale(image, (CARD_WIDTH, CARD_HEIGHT))
-                    images[key] = image
+                    sources[f'{rank}{suit}'] = os.path.join(CARD_DIR, filename)
+    return sources
+
+def atlas_key(sources):
+    """Fingerprint of the card size and the source files' names, sizes and mtimes."""
+    digest = hashlib.sha1(f'{CARD_WIDTH}x{CARD_HEIGHT}'.encode())
+    for key in sorted(sources):
+        stat = os.stat(sources[key])
+        digest.update(f'{key}:{os.path.basename(sources[key])}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()
+
+def atlas_rect(index):
+    return pygame.Rect(
+        (index % ATLAS_COLUMNS) * CARD_WIDTH, (index // ATLAS_COLUMNS) * CARD_HEIGHT,
+        CARD_WIDTH, CARD_HEIGHT
+    )
+
+def load_cached_atlas(key):
+    """Slice the cached sprite sheet, or return None if it is missing or stale."""
+    try:
+        with open(ATLAS_INDEX_PATH) as f:
+            index = json.load(f)
+        if index.get('key') != key:
+            return None
+        atlas = pygame.image.load(ATLAS_PATH).convert_alpha()
+        return {card: atlas.subsurface(atlas_rect(i)) for i, card in enumerate(index['cards'])}
+    except (OSError, KeyError, ValueError, pygame.error):
+        return None
+
+def build_card_atlas(sources, key):
+    """Decode and scale every card once, packing them into a cached sprite sheet."""
+    cards = sorted(sources)
+    rows = (len(cards) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+    atlas = pygame.Surface((ATLAS_COLUMNS * CARD_WIDTH, rows * CARD_HEIGHT), pygame.SRCALPHA)
+    for i, card in enumerate(cards):
+        image = pygame.image.load(sources[card]).convert_alpha()
+        image = pygame.transform.scale(image, (CARD_WIDTH, CARD_HEIGHT))
+        atlas.blit(image, atlas_rect(i))
+    try:
+        pygame.image.save(atlas, ATLAS_PATH)
+        with open(ATLAS_INDEX_PATH, 'w') as f:
+            json.dump({'key': key, 'cards': cards}, f)
+    except (OSError, pygame.error):
+        pass  # Read-only install: keep the atlas in memory only
+    return {card: atlas.subsurface(atlas_rect(i)) for i, card in enumerate(cards)}
+
+# Load card images
+def load_card_images():
+    sources = card_sources()
+    key = atlas_key(sources)
+    images = load_cached_atlas(key)
+    if images is None:
+        images = build_card_atlas(sources, key)
     # Generate card back image
     back_image = generate_card_back()
     images['back'] = back_image
@@ -73,40 +129,70 @@ def generate_card_back():
     pygame.draw.rect(back_surface, BLACK, back_surface.get_rect(), 2)
     return back_surface
 
-card_images = load_card_images()
+# Card images are loaded on first use, once the window exists
+screen = None
+card_images = {}
+
+def init_display():
+    """Create the window."""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Klondike Solitaire')
 
-# Card class
+def card_image(key):
+    """Return the image for a card key or 'back', loading the card atlas if needed."""
+    if not card_images:
+        card_images.update(load_card_images())
+    return card_images[key]
+
+# Image key of each card code, e.g. 'QH'
+CARD_KEYS = [f'{rank}{suit}' for suit in solver.SUITS for rank in solver.RANKS]
+RANK_VALUES = {rank: value for value, rank in enumerate(solver.RANKS, start=1)}
+
+# Card class; the card itself is a solver card code (suit * 13 + rank index)
 class Card:
+    __slots__ = ('code', 'face_up', 'rect', 'dragging')
+
     def __init__(self, suit, rank, face_up=False):
-        self.suit = suit
-        self.rank = rank
+        self.code = solver.card_code(suit, rank)
         self.face_up = face_up
-        self.image = self.get_image()
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, CARD_WIDTH, CARD_HEIGHT)
         self.dragging = False
 
+    @property
+    def suit(self):
+        return solver.SUITS[solver.card_suit(self.code)]
+
+    @property
+    def rank(self):
+        return solver.RANKS[solver.card_rank(self.code) - 1]
+
+    @property
+    def image(self):
+        # Looked up on demand so headless games never touch the images
+        return self.get_image()
+
     def get_image(self):
         if self.face_up:
-            key = f'{self.rank}{self.suit}'
-            return card_images[key]
+            return card_image(CARD_KEYS[self.code])
         else:
-            return card_images['back']
+            return card_image('back')
 
     def flip(self):
         self.face_up = not self.face_up
-        self.image = self.get_image()
 
 # Create deck
-def create_deck():
+def create_deck(rng=random):
     suits = ['S', 'H', 'D', 'C']  # Spades, Hearts, Diamonds, Clubs
     ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
     deck = [Card(suit, rank) for suit in suits for rank in ranks]
-    random.shuffle(deck)
+    rng.shuffle(deck)
     return deck
 
 # Initialize game
-def initialize_game():
-    deck = create_deck()
+def initialize_game(rng=random):
+    deck = create_deck(rng)
     tableau = [[] for _ in range(7)]
     foundations = [[] for _ in range(4)]
     waste_pile = []
@@ -118,174 +204,417 @@ def initialize_game():
             card = stock_pile.pop()
             face_up = (j == i)
             card.face_up = face_up
-            card.image = card.get_image()
             tableau[i].append(card)
 
     return stock_pile, waste_pile, tableau, foundations
 
-# Draw functions
-def draw_tableau(screen, tableau):
-    x_offset = 50
-    y_offset = 200
+# Layout: piles sit in columns PILE_SPACING apart
+PILE_SPACING = 100
+STOCK_POS = (50, 50)
+WASTE_POS = (150, 50)
+FOUNDATION_POS = (400, 50)
+TABLEAU_POS = (50, 200)
+# Vertical offset between a tableau card and the next one on top of it
+FACE_DOWN_GAP = 5
+FACE_UP_GAP = 20
+
+def layout_piles(waste_pile, tableau, foundations):
+    """Position the cards that can be clicked and return the new LayoutIndex.
+
+    Cards being dragged keep their rect.
+    """
+    x_offset, y_offset = TABLEAU_POS
     for pile in tableau:
         y = y_offset
         for card in pile:
-            card.rect.topleft = (x_offset, y)
-            screen.blit(card.image, card.rect)
+            if not card.dragging:
+                card.rect.topleft = (x_offset, y)
             if card.face_up:
-                y += 20
+                y += FACE_UP_GAP
             else:
-                y += 5
-        x_offset += 100
+                y += FACE_DOWN_GAP
+        x_offset += PILE_SPACING
+
+    x_offset, y_offset = FOUNDATION_POS
+    for foundation in foundations:
+        if foundation and not foundation[-1].dragging:
+            foundation[-1].rect.topleft = (x_offset, y_offset)
+        x_offset += PILE_SPACING
+
+    if waste_pile and not waste_pile[-1].dragging:
+        waste_pile[-1].rect.topleft = WASTE_POS
+    return LayoutIndex(waste_pile, tableau, foundations)
+
+def pile_column(x, left, count):
+    """Index of the pile whose card spans x in a row of count piles from left, or None."""
+    offset = x - left
+    column = offset // PILE_SPACING
+    if 0 <= column < count and offset - column * PILE_SPACING < CARD_WIDTH:
+        return column
+    return None
+
+class LayoutIndex:
+    """Hit-testing and drop regions for one layout of the piles.
+
+    Piles sit in fixed columns, so the pile under a point is found by
+    division. Within a tableau pile the face-down cards come first, spaced
+    FACE_DOWN_GAP apart, and the face-up run is spaced FACE_UP_GAP apart,
+    so the card under a point follows from the pile's face-down count.
+    Positions come from the layout, never from the rects of dragged cards.
+    """
+    def __init__(self, waste_pile, tableau, foundations):
+        self.waste_pile = waste_pile
+        self.tableau = tableau
+        self.foundations = foundations
+        self.hidden = []
+        for pile in tableau:
+            hidden = 0
+            while hidden < len(pile) and not pile[hidden].face_up:
+                hidden += 1
+            self.hidden.append(hidden)
+        self.foundation_drops = [foundation_rect(i) for i in range(len(foundations))]
+        self.tableau_drops = [self.card_rect(i, len(pile) - 1) for i, pile in enumerate(tableau)]
+
+    def card_rect(self, pile, index):
+        """Where card index of a tableau pile is laid out; index -1 is the empty slot."""
+        hidden = self.hidden[pile]
+        top = min(index, hidden) * FACE_DOWN_GAP + max(index - hidden, 0) * FACE_UP_GAP
+        return pygame.Rect(
+            TABLEAU_POS[0] + pile * PILE_SPACING, TABLEAU_POS[1] + max(top, 0), CARD_WIDTH, CARD_HEIGHT
+        )
+
+    def card_at(self, pos):
+        """Return (pile, index) of the card a click at pos picks up, or None.
+
+        In the tableau this is the deepest face-up card under the point,
+        which picks up the run from there.
+        """
+        x, y = pos
+        if y >= TABLEAU_POS[1]:
+            column = pile_column(x, TABLEAU_POS[0], len(self.tableau))
+            if column is None:
+                return None
+            pile, hidden = self.tableau[column], self.hidden[column]
+            face_up_top = TABLEAU_POS[1] + hidden * FACE_DOWN_GAP
+            # First face-up card whose bottom edge is below the point
+            index = max(hidden, (y - CARD_HEIGHT - face_up_top) // FACE_UP_GAP + hidden + 1)
+            if index < len(pile) and face_up_top + (index - hidden) * FACE_UP_GAP <= y:
+                return pile, index
+            return None
+        if not FOUNDATION_POS[1] <= y < FOUNDATION_POS[1] + CARD_HEIGHT:
+            return None
+        column = pile_column(x, FOUNDATION_POS[0], len(self.foundations))
+        if column is not None:
+            foundation = self.foundations[column]
+            return (foundation, len(foundation) - 1) if foundation else None
+        if self.waste_pile and pile_column(x, WASTE_POS[0], 1) is not None:
+            return self.waste_pile, len(self.waste_pile) - 1
+        return None
+
+    def drop_target(self, pos):
+        """Return ('foundation' | 'tableau', pile index) for a drop at pos, or None."""
+        column = pile_column(pos[0], FOUNDATION_POS[0], len(self.foundations))
+        if column is not None and self.foundation_drops[column].collidepoint(pos):
+            return 'foundation', column
+        column = pile_column(pos[0], TABLEAU_POS[0], len(self.tableau))
+        if column is not None and self.tableau_drops[column].collidepoint(pos):
+            return 'tableau', column
+        return None
+
+# Draw functions; a card being dragged is drawn separately on top
+def draw_tableau(screen, tableau):
+    for pile in tableau:
+        for card in pile:
+            if not card.dragging:
+                screen.blit(card.image, card.rect)
 
 def draw_foundations(screen, foundations):
-    x_offset = 400
-    y_offset = 50
+    x_offset, y_offset = FOUNDATION_POS
     for foundation in foundations:
         if foundation:
             card = foundation[-1]
-            card.rect.topleft = (x_offset, y_offset)
-            screen.blit(card.image, card.rect)
+            if not card.dragging:
+                screen.blit(card.image, card.rect)
         else:
             pygame.draw.rect(screen, WHITE, (x_offset, y_offset, CARD_WIDTH, CARD_HEIGHT), 2)
-        x_offset += 100
+        x_offset += PILE_SPACING
 
 def draw_stock_pile(screen, stock_pile):
-    x_offset = 50
-    y_offset = 50
+    x_offset, y_offset = STOCK_POS
     if stock_pile:
-        back_image = card_images['back']
+        back_image = card_image('back')
         screen.blit(back_image, (x_offset, y_offset))
     else:
         pygame.draw.rect(screen, WHITE, (x_offset, y_offset, CARD_WIDTH, CARD_HEIGHT), 2)
 
 def draw_waste_pile(screen, waste_pile):
-    x_offset = 150
-    y_offset = 50
+    x_offset, y_offset = WASTE_POS
     if waste_pile:
         card = waste_pile[-1]
-        card.rect.topleft = (x_offset, y_offset)
-        screen.blit(card.image, card.rect)
+        if not card.dragging:
+            screen.blit(card.image, card.rect)
     else:
         pygame.draw.rect(screen, WHITE, (x_offset, y_offset, CARD_WIDTH, CARD_HEIGHT), 2)
 
+# Game state
+class SolitaireGame:
+    """Klondike state driven by mouse events, with or without a window."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.stock_pile, self.waste_pile, self.tableau, self.foundations = initialize_game(self.rng)
+        self.selected_card = None
+        self.selected_pile = None
+        self.offset_x = 0
+        self.offset_y = 0
+        self.frame = 0
+        self.hint = None  # (source rect, target rect) to highlight
+        # Everything but the dragged card is drawn into a cached table surface
+        # that is only rebuilt when the piles change
+        self.table = None
+        self.dirty = True  # the window needs composing again
+        # Where the dragged card was last drawn, if it has moved since
+        self.vacated = None
+        self.layout = layout_piles(self.waste_pile, self.tableau, self.foundations)
+
+    def invalidate(self):
+        """Lay the piles out again and rebuild the table on the next draw."""
+        self.layout = layout_piles(self.waste_pile, self.tableau, self.foundations)
+        self.table = None
+        self.dirty = True
+
+    def won(self):
+        return all(len(foundation) == 13 for foundation in self.foundations)
+
+    def step(self, events=()):
+        """Apply one frame of mouse events given as ('down' | 'up' | 'motion', pos)."""
+        self.frame += 1
+        for kind, pos in events:
+            if kind == 'down':
+                self.mouse_down(pos)
+                self.invalidate()
+            elif kind == 'up':
+                self.mouse_up(pos)
+                self.invalidate()
+            elif kind == 'motion':
+                card = self.selected_card
+                if card and card.dragging:
+                    if self.vacated is None:
+                        self.vacated = card.rect.copy()
+                    card.rect.x = pos[0] + self.offset_x
+                    card.rect.y = pos[1] + self.offset_y
+
+    def select(self, card, pile, pos):
+        self.selected_card = card
+        self.selected_pile = pile
+        self.offset_x = card.rect.x - pos[0]
+        self.offset_y = card.rect.y - pos[1]
+        card.dragging = True
+
+    def mouse_down(self, pos):
+        self.hint = None
+        stock_pile, waste_pile = self.stock_pile, self.waste_pile
+        # Check stock pile click
+        if stock_pile and pygame.Rect(STOCK_POS, (CARD_WIDTH, CARD_HEIGHT)).collidepoint(pos):
+            card = stock_pile.pop()
+            card.face_up = True
+            waste_pile.append(card)
+        else:
+            # Waste, tableau or foundation card
+            hit = self.layout.card_at(pos)
+            if hit:
+                pile, index = hit
+                self.select(pile[index], pile, pos)
+
+    def mouse_up(self, pos):
+        selected_card = self.selected_card
+        if not selected_card:
+            return
+        selected_pile = self.selected_pile
+        target = self.layout.drop_target(pos)
+        if target and target[0] == 'foundation':
+            foundation = self.foundations[target[1]]
+            if can_move_to_foundation(selected_card, foundation):
+                move_to_foundation(selected_card, selected_pile, foundation)
+        elif target:
+            pile = self.tableau[target[1]]
+            if can_move_to_tableau(selected_card, pile):
+                move_to_tableau(selected_card, selected_pile, pile)
+        # The card returns to its original pile on the next layout if not dropped
+        selected_card.dragging = False
+        self.selected_card = None
+        self.selected_pile = None
+
+    def draw(self, surface):
+        """Compose whatever changed and return the rects of the window to update.
+
+        Dragging a card only restores the table under its old position and
+        draws it at the new one; the whole window is composed after the piles
+        change.
+        """
+        card = self.selected_card
+        if not card or not card.dragging:
+            card = None
+        vacated = self.vacated
+        self.vacated = None
+        if self.dirty:
+            if self.table is None:
+                self.table = pygame.Surface(surface.get_size())
+                self.table.fill(GREEN)
+                draw_stock_pile(self.table, self.stock_pile)
+                draw_waste_pile(self.table, self.waste_pile)
+                draw_foundations(self.table, self.foundations)
+                draw_tableau(self.table, self.tableau)
+                if self.hint:
+                    for rect in self.hint:
+                        pygame.draw.rect(self.table, HINT_COLOR, rect, 3)
+            surface.blit(self.table, (0, 0))
+            if card:
+                surface.blit(card.image, card.rect)
+            self.dirty = False
+            return [surface.get_rect()]
+        if vacated is None or card is None:
+            return []
+        surface.blit(self.table, vacated, vacated)
+        surface.blit(card.image, card.rect)
+        return [vacated, card.rect.copy()]
+
+    def foundation_slot(self, suit):
+        """Index of the foundation holding a suit index, or of the first empty one."""
+        for i, foundation in enumerate(self.foundations):
+            if foundation and solver.card_suit(foundation[-1].code) == suit:
+                return i
+        for i, foundation in enumerate(self.foundations):
+            if not foundation:
+                return i
+        return 0
+
+    def show_hint(self, move):
+        """Highlight the card a solver move picks up and where it goes."""
+        self.table = None
+        self.dirty = True
+        if move is None:
+            self.hint = None
+            return
+        kind = move[0]
+        tableau = self.tableau
+        if kind == 'draw':
+            self.hint = (pygame.Rect(STOCK_POS, (CARD_WIDTH, CARD_HEIGHT)), pygame.Rect(WASTE_POS, (CARD_WIDTH, CARD_HEIGHT)))
+            return
+        if kind in ('waste_foundation', 'waste_tableau'):
+            source = self.waste_pile[-1].rect
+        elif kind == 'tableau_foundation':
+            source = tableau[move[1]][-1].rect
+        elif kind == 'tableau_tableau':
+            source = tableau[move[1]][move[2]].rect
+        else:
+            source = foundation_rect(self.foundation_slot(move[1]))
+        if kind in ('waste_foundation', 'tableau_foundation'):
+            card = move[-1]
+            target = foundation_rect(self.foundation_slot(solver.card_suit(card)))
+        else:
+            dst = move[-2] if kind == 'tableau_tableau' else move[-1]
+            target = self.layout.tableau_drops[dst]
+        self.hint = (source.copy(), target.copy())
+
+def foundation_rect(i):
+    return pygame.Rect(FOUNDATION_POS[0] + i * PILE_SPACING, FOUNDATION_POS[1], CARD_WIDTH, CARD_HEIGHT)
+
+def snapshot(game):
+    """Encode the piles as card codes for the solver."""
+    def codes(pile):
+        return [card.code for card in pile]
+    return (
+        codes(game.stock_pile),
+        codes(game.waste_pile),
+        [codes(pile) for pile in game.tableau],
+        [sum(not card.face_up for card in pile) for pile in game.tableau],
+        [codes(foundation) for foundation in game.foundations],
+    )
+
+def find_winnable_seed(first_seed, attempts=50, max_nodes=1000, max_seconds=1.0):
+    """Return the first seed from first_seed on whose deal the solver wins, or None.
+
+    Each try gets a small budget: easy wins turn up within it quickly, and
+    enough deals are easy that one is nearly always found well before the
+    max_seconds limit on the whole search.
+    """
+    deadline = time.perf_counter() + max_seconds
+    for seed in range(first_seed, first_seed + attempts):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        if solver.solve(snapshot(SolitaireGame(seed)), max_nodes, max_seconds=remaining).status == 'win':
+            return seed
+    return None
+
+def run_headless(policy, max_frames=100000, seed=None):
+    """Play a game without a window; policy(game) returns each frame's mouse events."""
+    game = SolitaireGame(seed)
+    while not game.won() and game.frame < max_frames:
+        game.step(policy(game))
+    return game
+
+# Mouse events the game reacts to
+MOUSE_EVENTS = {
+    pygame.MOUSEBUTTONDOWN: 'down',
+    pygame.MOUSEBUTTONUP: 'up',
+    pygame.MOUSEMOTION: 'motion',
+}
+
 # Main game loop
 def main():
-    stock_pile, waste_pile, tableau, foundations = initialize_game()
+    game = SolitaireGame()
     running = True
     clock = pygame.time.Clock()
-    selected_card = None
-    selected_pile = None
-    offset_x = 0
-    offset_y = 0
+    # Solver searches run in a worker process so the frame loop never waits on them
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    pending_hint = None  # (future, snapshot the search started from)
+    pending_deal = None
 
     while running:
+        events = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-            # Mouse events
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
-                # Check stock pile click
-                if stock_pile and pygame.Rect(50, 50, CARD_WIDTH, CARD_HEIGHT).collidepoint(pos):
-                    card = stock_pile.pop()
-                    card.face_up = True
-                    card.image = card.get_image()
-                    waste_pile.append(card)
-                # Check waste pile click
-                elif waste_pile:
-                    card = waste_pile[-1]
-                    if card.rect.collidepoint(pos):
-                        selected_card = card
-                        selected_pile = waste_pile
-                        offset_x = card.rect.x - pos[0]
-                        offset_y = card.rect.y - pos[1]
-                        card.dragging = True
-                # Check tableau click
-                for pile in tableau:
-                    if pile:
-                        for i in range(len(pile)):
-                            card = pile[i]
-                            if card.face_up and card.rect.collidepoint(pos):
-                                selected_card = card
-                                selected_pile = pile
-                                offset_x = card.rect.x - pos[0]
-                                offset_y = card.rect.y - pos[1]
-                                card.dragging = True
-                                break
-                # Check foundations click
-                for foundation in foundations:
-                    if foundation:
-                        card = foundation[-1]
-                        if card.rect.collidepoint(pos):
-                            selected_card = card
-                            selected_pile = foundation
-                            offset_x = card.rect.x - pos[0]
-                            offset_y = card.rect.y - pos[1]
-                            card.dragging = True
-
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if selected_card:
-                    pos = pygame.mouse.get_pos()
-                    # Check for drop on foundations
-                    dropped = False
-                    x_offset = 400
-                    y_offset = 50
-                    for foundation in foundations:
-                        foundation_rect = pygame.Rect(x_offset, y_offset, CARD_WIDTH, CARD_HEIGHT)
-                        if foundation_rect.collidepoint(pos):
-                            if can_move_to_foundation(selected_card, foundation):
-                                move_to_foundation(selected_card, selected_pile, foundation)
-                                dropped = True
-                            break
-                        x_offset += 100
-                    # Check for drop on tableau
-                    if not dropped:
-                        x_offset = 50
-                        y_offset = 200
-                        for pile in tableau:
-                            if pile:
-                                rect = pile[-1].rect
-                            else:
-                                rect = pygame.Rect(x_offset, y_offset, CARD_WIDTH, CARD_HEIGHT)
-                            if rect.collidepoint(pos):
-                                if can_move_to_tableau(selected_card, pile):
-                                    move_to_tableau(selected_card, selected_pile, pile)
-                                    dropped = True
-                                break
-                            x_offset += 100
-                    # Return card to original pile if not dropped
-                    if not dropped:
-                        selected_card.rect.topleft = (selected_card.rect.x, selected_card.rect.y)
-                    selected_card.dragging = False
-                    selected_card = None
-                    selected_pile = None
-
-            elif event.type == pygame.MOUSEMOTION:
-                if selected_card and selected_card.dragging:
-                    pos = pygame.mouse.get_pos()
-                    selected_card.rect.x = pos[0] + offset_x
-                    selected_card.rect.y = pos[1] + offset_y
-
-        # Draw everything
-        screen.fill(GREEN)
-        draw_stock_pile(screen, stock_pile)
-        draw_waste_pile(screen, waste_pile)
-        draw_foundations(screen, foundations)
-        draw_tableau(screen, tableau)
-        pygame.display.flip()
+            elif event.type in MOUSE_EVENTS:
+                events.append((MOUSE_EVENTS[event.type], event.pos))
+            elif event.type == pygame.KEYDOWN:
+                # H asks for a hint, N deals a new game the solver can win
+                if event.key == pygame.K_h and pending_hint is None:
+                    state = snapshot(game)
+                    pending_hint = (executor.submit(solver.hint, state), state)
+                elif event.key == pygame.K_n and pending_deal is None:
+                    pending_deal = executor.submit(find_winnable_seed, random.randrange(2 ** 32))
+        game.step(events)
+
+        # Pick up finished searches; a hint is dropped if the piles changed meanwhile
+        if pending_hint and pending_hint[0].done():
+            future, state = pending_hint
+            pending_hint = None
+            if snapshot(game) == state:
+                game.show_hint(future.result())
+        if pending_deal and pending_deal.done():
+            seed = pending_deal.result()
+            pending_deal = None
+            if seed is not None:
+                game = SolitaireGame(seed)
+
+        # Push only the parts of the window that changed
+        dirty = game.draw(screen)
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(60)
 
+    executor.shutdown(wait=False, cancel_futures=True)
     pygame.quit()
     sys.exit()
 
 # Game logic functions
 def can_move_to_foundation(card, foundation):
     if not foundation:
-        return card.rank == 'A'
-    top_card = foundation[-1]
-    return card.suit == top_card.suit and rank_value(card.rank) == rank_value(top_card.rank) + 1
+        return solver.CARD_RANK[card.code] == 1
+    top_code = foundation[-1].code
+    return card.code == top_code + 1 and solver.card_suit(card.code) == solver.card_suit(top_code)
 
 def move_to_foundation(card, source_pile, foundation):
     idx = source_pile.index(card)
@@ -297,9 +626,8 @@ def move_to_foundation(card, source_pile, foundation):
 
 def can_move_to_tableau(card, pile):
     if not pile:
-        return card.rank == 'K'
-    top_card = pile[-1]
-    return is_alternate_color(card, top_card) and rank_value(card.rank) == rank_value(top_card.rank) - 1
+        return solver.CARD_RANK[card.code] == 13
+    return solver.stacks_on(card.code, pile[-1].code)
 
 def move_to_tableau(card, source_pile, target_pile):
     idx = source_pile.index(card)
@@ -310,16 +638,12 @@ def move_to_tableau(card, source_pile, target_pile):
         source_pile[-1].flip()
 
 def is_alternate_color(card1, card2):
-    red_suits = ['H', 'D']
-    black_suits = ['S', 'C']
-    return (card1.suit in red_suits and card2.suit in black_suits) or (card1.suit in black_suits and card2.suit in red_suits)
+    return solver.CARD_RED[card1.code] != solver.CARD_RED[card2.code]
 
 def rank_value(rank):
-    ranks = {'A':1, '2':2, '3':3, '4':4, '5':5,
-             '6':6, '7':7, '8':8, '9':9, '10':10,
-             'J':11, 'Q':12, 'K':13}
-    return ranks[rank]
+    return RANK_VALUES[rank]
 
 if __name__ == '__main__':
+    init_display()
     main()
 
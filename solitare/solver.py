@@ -0,0 +1,416 @@
+"""Klondike solver for the rules used by solitare.py.
+
+Stock cards are drawn one at a time and the waste is never recycled. Cards
+are encoded as small ints, suit index * 13 + rank index, using the suit and
+rank order of create_deck(). The solver sees every card, including the
+face-down ones, so a 'win' result proves the deal can be won. To keep the
+search small it only tries moves that can lead somewhere new: runs are not
+shuffled between piles without uncovering a useful card, a pile is not
+emptied unless a king is waiting for it, the stock is drawn straight down to
+a card that can be played, and a move made only to set up another must be
+followed by it. Those rules can skip a winning line, so a 'loss' means none
+of the lines the solver tries wins; it is not a proof that the deal is lost.
+"""
+import time
+
+SUITS = ['S', 'H', 'D', 'C']
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+RED_SUITS = (1, 2)
+
+# Default node budget; about two seconds on typical hardware, so hints are also time-limited
+MAX_NODES = 100000
+TABLE_SIZE = 200000
+# Seconds a hint may search before settling for the best-ranked move
+HINT_SECONDS = 0.5
+
+# Focus of KlondikeState.moves() on the waste rather than a tableau pile
+WASTE = -1
+
+# Lookup tables indexed by card code
+CARD_RANK = [code % 13 + 1 for code in range(52)]
+CARD_RED = [code // 13 in RED_SUITS for code in range(52)]
+# The two cards that can be placed on each card in the tableau
+STACKS_BELOW = [
+    [suit * 13 + code % 13 - 1 for suit in ((0, 3) if CARD_RED[code] else (1, 2))] if code % 13 else []
+    for code in range(52)
+]
+# Bitmask of the two cards each card can be placed on in the tableau
+STACKS_ON_MASK = [
+    sum(1 << suit * 13 + code % 13 + 1 for suit in ((0, 3) if CARD_RED[code] else (1, 2))) if code % 13 < 12 else 0
+    for code in range(52)
+]
+# Bitmask of the lower cards of each card's suit
+LOWER_MASK = [((1 << code % 13) - 1) << code - code % 13 for code in range(52)]
+
+def card_code(suit, rank):
+    return SUITS.index(suit) * 13 + RANKS.index(rank)
+
+def card_suit(code):
+    return code // 13
+
+def card_rank(code):
+    """Rank from 1 (ace) to 13 (king)."""
+    return code % 13 + 1
+
+def stacks_on(card, target):
+    """Whether card can be placed on target in the tableau."""
+    return CARD_RED[card] != CARD_RED[target] and CARD_RANK[card] == CARD_RANK[target] - 1
+
+class TranspositionTable:
+    """Bounded set of visited state keys with least-recently-used eviction.
+
+    Python dicts keep insertion order, so refreshing a key on lookup moves it
+    to the end and the oldest half is dropped whenever the table fills up.
+    """
+    def __init__(self, capacity=TABLE_SIZE):
+        self.capacity = capacity
+        self.entries = {}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def seen(self, key):
+        """Return True if key was already stored, storing it otherwise."""
+        entries = self.entries
+        if key in entries:
+            del entries[key]
+            entries[key] = None
+            return True
+        entries[key] = None
+        if len(entries) > self.capacity:
+            keys = list(entries)
+            drop = len(keys) // 2
+            self.entries = dict.fromkeys(keys[drop:])
+            self.evictions += drop
+        return False
+
+class SolveResult:
+    """Outcome of a search: status is 'win', 'loss' or 'unknown'."""
+    def __init__(self, status, moves, nodes, elapsed):
+        self.status = status
+        self.moves = moves
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f'SolveResult({self.status!r}, moves={len(self.moves)}, nodes={self.nodes}, elapsed={self.elapsed:.3f})'
+
+class KlondikeState:
+    """Mutable search state with apply/undo for every move.
+
+    Moves are tuples that carry what undo needs:
+      ('draw', count)
+      ('waste_foundation', card)
+      ('waste_tableau', dst)
+      ('tableau_foundation', src, card)
+      ('tableau_tableau', src, index, dst, count)
+      ('foundation_tableau', suit, dst)
+    """
+    def __init__(self, stock, waste, tableau, hidden, foundation):
+        self.stock = list(stock)  # top of the stock is the last card
+        self.waste = list(waste)
+        self.tableau = [list(pile) for pile in tableau]
+        self.hidden = list(hidden)  # face-down cards at the bottom of each pile
+        self.foundation = list(foundation)  # cards on the foundation of each suit
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build a state from (stock, waste, tableau, hidden, foundation slots)."""
+        stock, waste, tableau, hidden, slots = snapshot
+        foundation = [0] * 4
+        for slot in slots:
+            if slot:
+                foundation[card_suit(slot[-1])] = card_rank(slot[-1])
+        return cls(stock, waste, tableau, hidden, foundation)
+
+    def key(self):
+        """Canonical encoding: tableau pile order does not matter."""
+        piles = sorted(bytes([self.hidden[i]]) + bytes(pile) for i, pile in enumerate(self.tableau))
+        return (
+            bytes(self.foundation) + bytes([len(self.stock)]) + bytes(self.waste) +
+            b'\xff' + b'\xfe'.join(piles)
+        )
+
+    def won(self):
+        return sum(self.foundation) == 52
+
+    def is_safe_foundation(self, card):
+        """A foundation move no later tableau play could need to undo."""
+        rank = CARD_RANK[card]
+        if rank <= 2:
+            return True
+        if CARD_RED[card]:
+            return self.foundation[0] >= rank - 1 and self.foundation[3] >= rank - 1
+        return self.foundation[1] >= rank - 1 and self.foundation[2] >= rank - 1
+
+    def moves(self, focus=None):
+        """Promising legal moves, best first; a safe foundation move is returned alone.
+
+        focus is WASTE or a pile index after a move made only to set up the
+        next one (see solve()); then only moves that finish the job are
+        returned.
+        """
+        scored = []
+        tableau, hidden, foundation = self.tableau, self.hidden, self.foundation
+        stock = self.stock
+        waste_top = self.waste[-1] if self.waste else None
+
+        # Moves to the foundations
+        if waste_top is not None and foundation[waste_top // 13] == waste_top % 13:
+            if self.is_safe_foundation(waste_top):
+                return [('waste_foundation', waste_top)]
+            scored.append((90, ('waste_foundation', waste_top)))
+        for src, pile in enumerate(tableau):
+            if len(pile) > hidden[src]:
+                card = pile[-1]
+                if foundation[card // 13] == card % 13:
+                    if self.is_safe_foundation(card):
+                        return [('tableau_foundation', src, card)]
+                    scored.append((100 + hidden[src], ('tableau_foundation', src, card)))
+
+        # Piles each card could be placed on, and the first empty pile
+        targets = {}
+        empty = None
+        for dst, target in enumerate(tableau):
+            if not target:
+                if empty is None:
+                    empty = dst
+            elif len(target) > hidden[dst]:
+                for card in STACKS_BELOW[target[-1]]:
+                    targets.setdefault(card, []).append(dst)
+
+        # A king that could use an empty pile: on the waste or covering face-down cards
+        king_waiting = waste_top is not None and CARD_RANK[waste_top] == 13
+        for src, pile in enumerate(tableau):
+            if hidden[src] and CARD_RANK[pile[hidden[src]]] == 13:
+                king_waiting = True
+
+        # Tableau to tableau, only when the move uncovers something useful
+        for src, pile in enumerate(tableau):
+            first = hidden[src]
+            for index in range(first, len(pile)):
+                card = pile[index]
+                if index == first:
+                    if first:
+                        score = 80 + first  # turns a face-down card
+                    elif empty is None and king_waiting:
+                        score = 20  # empties the pile for a king
+                    else:
+                        continue
+                else:
+                    below = pile[index - 1]
+                    if foundation[below // 13] == below % 13:
+                        score = 60
+                    elif waste_top is not None and stacks_on(waste_top, below):
+                        score = 40
+                    else:
+                        continue
+                for dst in targets.get(card, ()):
+                    scored.append((score, ('tableau_tableau', src, index, dst, len(pile) - index)))
+                if empty is not None and index > 0 and CARD_RANK[card] == 13:
+                    scored.append((score, ('tableau_tableau', src, index, empty, len(pile) - index)))
+
+        # Waste to tableau
+        if waste_top is not None:
+            for dst in targets.get(waste_top, ()):
+                scored.append((50, ('waste_tableau', dst)))
+            if empty is not None and CARD_RANK[waste_top] == 13:
+                scored.append((45, ('waste_tableau', empty)))
+
+        # Draw down to a stock card that can be played, now or once there is
+        # room for it; drawing past cards only buries them, so there is no
+        # point stopping anywhere else
+        if stock and focus is None:
+            # Cards a drawn card could be placed on: face up or on top of a foundation
+            reachable = 0
+            for src, pile in enumerate(tableau):
+                for card in pile[hidden[src]:]:
+                    reachable |= 1 << card
+            for suit in range(4):
+                if foundation[suit]:
+                    reachable |= 1 << suit * 13 + foundation[suit] - 1
+            below = 0
+            for card in self.waste:
+                below |= 1 << card
+            count = 0
+            for card in reversed(stock):
+                count += 1
+                parents = STACKS_ON_MASK[card]  # none for a king, which can use an empty pile
+                if parents & reachable or foundation[card // 13] == card % 13 or not parents:
+                    scored.append((30, ('draw', count)))
+                elif LOWER_MASK[card] & below and not parents & ~below:
+                    # Both cards it stacks on and a lower card of its suit would be
+                    # under it in the waste, so it and everything under it are stuck
+                    break
+                below |= 1 << card
+
+        # Foundation back to tableau, when the card can then take the waste
+        # card or a run that is covering face-down cards
+        for suit in range(4):
+            rank = foundation[suit]
+            if rank < 3:
+                continue
+            card = suit * 13 + rank - 1
+            if card not in targets:
+                continue
+            useful = waste_top is not None and stacks_on(waste_top, card)
+            for src, pile in enumerate(tableau):
+                if hidden[src] and stacks_on(pile[hidden[src]], card):
+                    useful = True
+            if useful:
+                for dst in targets[card]:
+                    scored.append((5, ('foundation_tableau', suit, dst)))
+
+        scored.sort(key=lambda item: -item[0])
+        if focus is None:
+            return [move for _, move in scored]
+        return [move for _, move in scored if self.finishes(move, focus)]
+
+    def finishes(self, move, focus):
+        """Whether move plays the card a set-up move was made for, or makes room for it."""
+        kind = move[0]
+        if focus == WASTE:
+            if kind in ('waste_foundation', 'waste_tableau'):
+                return True
+            top = self.waste[-1]
+            if kind == 'tableau_tableau':
+                _, src, index, _, _ = move
+                if index == 0:
+                    return CARD_RANK[top] == 13
+                return index > self.hidden[src] and stacks_on(top, self.tableau[src][index - 1])
+            if kind == 'foundation_tableau':
+                suit = move[1]
+                return stacks_on(top, suit * 13 + self.foundation[suit] - 1)
+            return False
+        if kind == 'tableau_foundation':
+            return move[1] == focus
+        if kind == 'tableau_tableau':
+            return move[3] == focus
+        return kind in ('waste_tableau', 'foundation_tableau') and move[-1] == focus
+
+    def reveal(self, src):
+        """Turn the new top card of a pile face up; return whether one was turned."""
+        pile = self.tableau[src]
+        if pile and self.hidden[src] == len(pile):
+            self.hidden[src] -= 1
+            return True
+        return False
+
+    def apply(self, move):
+        """Play a move; return whether it turned a face-down card."""
+        kind = move[0]
+        if kind == 'draw':
+            count = move[1]
+            self.waste.extend(reversed(self.stock[-count:]))
+            del self.stock[-count:]
+        elif kind == 'waste_foundation':
+            self.waste.pop()
+            self.foundation[card_suit(move[1])] += 1
+        elif kind == 'waste_tableau':
+            self.tableau[move[1]].append(self.waste.pop())
+        elif kind == 'tableau_foundation':
+            self.tableau[move[1]].pop()
+            self.foundation[card_suit(move[2])] += 1
+            return self.reveal(move[1])
+        elif kind == 'tableau_tableau':
+            _, src, index, dst, _ = move
+            pile = self.tableau[src]
+            self.tableau[dst].extend(pile[index:])
+            del pile[index:]
+            return self.reveal(src)
+        elif kind == 'foundation_tableau':
+            _, suit, dst = move
+            self.tableau[dst].append(suit * 13 + self.foundation[suit] - 1)
+            self.foundation[suit] -= 1
+        return False
+
+    def undo(self, move, revealed):
+        """Take back a move played by apply()."""
+        kind = move[0]
+        if kind == 'draw':
+            count = move[1]
+            self.stock.extend(reversed(self.waste[-count:]))
+            del self.waste[-count:]
+        elif kind == 'waste_foundation':
+            self.foundation[card_suit(move[1])] -= 1
+            self.waste.append(move[1])
+        elif kind == 'waste_tableau':
+            self.waste.append(self.tableau[move[1]].pop())
+        elif kind == 'tableau_foundation':
+            if revealed:
+                self.hidden[move[1]] += 1
+            self.foundation[card_suit(move[2])] -= 1
+            self.tableau[move[1]].append(move[2])
+        elif kind == 'tableau_tableau':
+            _, src, _, dst, count = move
+            if revealed:
+                self.hidden[src] += 1
+            target = self.tableau[dst]
+            self.tableau[src].extend(target[-count:])
+            del target[-count:]
+        elif kind == 'foundation_tableau':
+            _, suit, dst = move
+            self.tableau[dst].pop()
+            self.foundation[suit] += 1
+
+def solve(snapshot, max_nodes=MAX_NODES, table_size=TABLE_SIZE, max_seconds=None):
+    """Search for a winning line from a snapshot of the game.
+
+    Returns a SolveResult whose moves list the winning line when the status
+    is 'win'. 'loss' means the moves the solver tries never win (see the
+    module docstring); 'unknown' means the node or time budget ran out first.
+    """
+    start = time.perf_counter()
+    state = KlondikeState.from_snapshot(snapshot)
+    if state.won():
+        return SolveResult('win', [], 0, 0.0)
+    table = TranspositionTable(table_size)
+    table.seen(state.key())
+    deadline = start + max_seconds if max_seconds else None
+    nodes = 0
+
+    # Iterative depth-first search; path holds the (move, revealed) pairs
+    # leading to the current state and stack the remaining moves at each depth
+    path = []
+    stack = [iter(state.moves())]
+    while stack:
+        move = next(stack[-1], None)
+        if move is None:
+            stack.pop()
+            if path:
+                state.undo(*path.pop())
+            continue
+        nodes += 1
+        if nodes > max_nodes or (deadline and not nodes & 1023 and time.perf_counter() > deadline):
+            return SolveResult('unknown', [], nodes, time.perf_counter() - start)
+        revealed = state.apply(move)
+        if state.won():
+            path.append((move, revealed))
+            return SolveResult('win', [m for m, _ in path], nodes, time.perf_counter() - start)
+        if table.seen(state.key()):
+            state.undo(move, revealed)
+            continue
+        path.append((move, revealed))
+        # A draw, or a move between piles that turns nothing over, only sets up
+        # the next move, so that next move has to use what it set up
+        kind = move[0]
+        if kind == 'draw':
+            focus = WASTE
+        elif kind == 'tableau_tableau' and not revealed:
+            focus = move[1]
+        elif kind == 'foundation_tableau':
+            focus = move[2]
+        else:
+            focus = None
+        stack.append(iter(state.moves(focus)))
+
+    return SolveResult('loss', [], nodes, time.perf_counter() - start)
+
+def hint(snapshot, max_nodes=MAX_NODES, max_seconds=HINT_SECONDS):
+    """First move of a winning line, or the best-ranked move if no win was found in time."""
+    result = solve(snapshot, max_nodes, max_seconds=max_seconds)
+    if result.status == 'win':
+        return result.moves[0] if result.moves else None
+    moves = KlondikeState.from_snapshot(snapshot).moves()
+    return moves[0] if moves else None
@@ -0,0 +1,58 @@
+import numpy as np
+
+class EntityStore:
+    """Structure-of-arrays entity table with one NumPy column per field.
+
+    Live entities occupy rows 0 to len(store) - 1 of every column, so batch
+    updates are plain array operations on store['field']. Removing a row
+    moves the last row into the hole, keeping the columns packed.
+    """
+    def __init__(self, fields, capacity=64):
+        self.fields = dict(fields)  # name -> dtype
+        self.capacity = capacity
+        self.count = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.fields.items()}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """Writable view of a column's live rows."""
+        return self.columns[name][:self.count]
+
+    def __setitem__(self, name, values):
+        self.columns[name][:self.count] = values
+
+    def reserve(self, capacity):
+        """Grow the columns to hold at least capacity rows."""
+        if capacity <= self.capacity:
+            return
+        while self.capacity < capacity:
+            self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+
+    def extend(self, **values):
+        """Append rows given as one array (or scalar) per field."""
+        size = max(np.size(value) for value in values.values())
+        if not size:
+            return
+        self.reserve(self.count + size)
+        rows = slice(self.count, self.count + size)
+        for name, column in self.columns.items():
+            column[rows] = values.get(name, 0)
+        self.count += size
+
+    def remove(self, indices):
+        """Swap-remove the given rows; indices refer to the rows before removal."""
+        for i in sorted(set(int(i) for i in indices), reverse=True):
+            last = self.count - 1
+            if i != last:
+                for column in self.columns.values():
+                    column[i] = column[last]
+            self.count = last
+
+    def clear(self):
+        self.count = 0
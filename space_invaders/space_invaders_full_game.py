@@ -3,16 +3,29 @@ import random
 import sys
 import os
 
-# Initialize Pygame
-pygame.init()
+# The shared text cache lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_cache
+from entities import EntityStore
+from spatial_hash import SpatialHash
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
-# Create the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Enhanced Space Invaders')
+# Simulation rate; enemy fire timers advance this many milliseconds per frame
+FPS = 60
+FRAME_TIME = 1000 / FPS
+
+# Side of a collision grid cell; a bit larger than an enemy
+GRID_CELL = 64
+
+# Columns of the enemy and enemy bullet stores
+ENEMY_FIELDS = {
+    'x': float, 'y': float, 'x_change': float, 'y_change': float,
+    'last_shot_time': float, 'fire_interval': float,
+}
+BULLET_FIELDS = {'x': float, 'y': float}
 
 # Load background
 background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -21,7 +34,6 @@ background.fill((0, 0, 0))  # Black background
 # Player image
 player_image = pygame.Surface((50, 50), pygame.SRCALPHA)
 pygame.draw.polygon(player_image, (0, 255, 0), [(25, 0), (0, 50), (50, 50)])
-player_rect = player_image.get_rect()
 
 # Enemy image
 enemy_image = pygame.Surface((40, 40), pygame.SRCALPHA)
@@ -34,15 +46,26 @@ bullet_image.fill((255, 255, 0))
 enemy_bullet_image = pygame.Surface((5, 15), pygame.SRCALPHA)
 enemy_bullet_image.fill((255, 0, 0))
 
-# Fonts
-font = pygame.font.SysFont('Arial', 32)
+ENEMY_WIDTH, ENEMY_HEIGHT = enemy_image.get_size()
+BULLET_WIDTH, BULLET_HEIGHT = bullet_image.get_size()
+ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT = enemy_bullet_image.get_size()
+
+# Window is created by init_display()
+screen = None
+
+def init_display():
+    """Create the window used by the windowed game."""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Enhanced Space Invaders')
 
 def show_text(text, x, y, color=(255, 255, 255)):
-    label = font.render(text, True, color)
+    label = text_cache.render(text, 'Arial', 32, color)
     screen.blit(label, (x, y))
 
 def game_over_screen(score):
-    """Display 'Game Over' message and high scores."""
+    """Display 'Game Over' message and high scores until a key is pressed."""
     # Load high scores
     high_scores = load_high_scores()
     # Update high scores
@@ -51,7 +74,7 @@ def game_over_screen(score):
         save_high_scores(high_scores)
 
     screen.fill((0, 0, 0))  # Clear the screen
-    over_text = font.render("GAME OVER", True, (255, 0, 0))
+    over_text = text_cache.render("GAME OVER", 'Arial', 32, (255, 0, 0))
     screen.blit(
         over_text,
         (SCREEN_WIDTH // 2 - over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 100)
@@ -75,11 +98,11 @@ def game_over_screen(score):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 waiting = False
+                text_cache.clear()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 waiting = False
-                main()  # Restart the game
 
 def load_high_scores():
     """Load high scores from a file."""
@@ -103,200 +126,241 @@ def update_high_scores(scores, new_score):
     scores = scores[:5]
     return True
 
-def main():
-    global enemy_speed, enemy_bullet_speed, enemy_fire_delay
-
-    # Game variables
-    player_speed = 5
-    bullet_speed = -10
-    enemy_speed = 1
-    enemy_bullet_speed = 5
-
-    player_x = SCREEN_WIDTH // 2 - player_rect.width // 2
-    player_y = SCREEN_HEIGHT - player_rect.height - 10
-    player_x_change = 0
-    player_lives = 3
-    level = 1
-    max_level = 5
-    score_value = 0
-
-    # Initialize bullet rects inside main
-    bullet_rect = bullet_image.get_rect()
-    enemy_bullet_rect = enemy_bullet_image.get_rect()
-
-    # Enemy variables
-    enemies = []
-    enemy_bullets = []
-    num_of_enemies = 3  # Starting with 3 enemies
-    initial_enemy_fire_delay = 3500  # Increased initial delay to 3500 ms
-    enemy_fire_delay = initial_enemy_fire_delay
-
-    # Create enemies
-    def create_enemies(num):
+class SpaceInvadersGame:
+    """Space Invaders state that can be advanced with or without a window."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        # Simulated milliseconds since the start; drives enemy fire timers
+        self.time = 0
+        self.frame = 0
+
+        # Game variables
+        self.player_speed = 5
+        self.bullet_speed = -10
+        self.enemy_speed = 1
+        self.enemy_bullet_speed = 5
+
+        self.player_rect = player_image.get_rect()
+        self.player_x = SCREEN_WIDTH // 2 - self.player_rect.width // 2
+        self.player_y = SCREEN_HEIGHT - self.player_rect.height - 10
+        self.player_lives = 3
+        self.level = 1
+        self.max_level = 5
+        self.score_value = 0
+        self.won = False
+        self.over = False
+
+        # Enemy variables; enemies and enemy bullets live in array-backed
+        # stores and are indexed by uniform grids each frame for collisions
+        self.enemies = EntityStore(ENEMY_FIELDS)
+        self.enemy_bullets = EntityStore(BULLET_FIELDS)
+        self.enemy_grid = SpatialHash(GRID_CELL, SCREEN_WIDTH)
+        self.bullet_grid = SpatialHash(GRID_CELL, SCREEN_WIDTH)
+        self.num_of_enemies = 3  # Starting with 3 enemies
+        self.initial_enemy_fire_delay = 3500  # Increased initial delay to 3500 ms
+        self.enemy_fire_delay = self.initial_enemy_fire_delay
+        self.create_enemies(self.num_of_enemies)
+
+        # Bullet variables
+        self.bullet_x = 0
+        self.bullet_y = self.player_y
+        self.bullet_state = "ready"  # "ready" or "fire"
+
+    def fire_interval(self):
+        """Pick a random delay before an enemy's next shot."""
+        return self.rng.randint(int(self.enemy_fire_delay * 0.5), int(self.enemy_fire_delay * 1.5))
+
+    def create_enemies(self, num):
+        """Spawn a wave of enemies."""
+        xs, ys, intervals = [], [], []
         for _ in range(num):
-            enemy = {
-                'x': random.randint(0, SCREEN_WIDTH - enemy_image.get_width()),
-                'y': random.randint(50, 150),
-                'x_change': enemy_speed,
-                'y_change': 40,
-                'last_shot_time': pygame.time.get_ticks(),
-                'fire_interval': random.randint(int(enemy_fire_delay * 0.5), int(enemy_fire_delay * 1.5))
-            }
-            enemies.append(enemy)
-
-    create_enemies(num_of_enemies)
-
-    # Bullet variables
-    bullet_x = 0
-    bullet_y = player_y
-    bullet_state = "ready"  # "ready" or "fire"
-
-    running = True
-    clock = pygame.time.Clock()
-
-    while running:
-        # Fill background
-        screen.blit(background, (0, 0))
-
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                sys.exit()
-
-            # Keystroke events
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    player_x_change = -player_speed
-                if event.key == pygame.K_RIGHT:
-                    player_x_change = player_speed
-                if event.key == pygame.K_SPACE:
-                    if bullet_state == "ready":
-                        bullet_x = player_x + player_rect.width // 2 - bullet_image.get_width() // 2
-                        bullet_y = player_y
-                        bullet_state = "fire"
-            if event.type == pygame.KEYUP:
-                if event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT:
-                    player_x_change = 0
+            xs.append(self.rng.randint(0, SCREEN_WIDTH - ENEMY_WIDTH))
+            ys.append(self.rng.randint(50, 150))
+            intervals.append(self.fire_interval())
+        self.enemies.extend(
+            x=xs, y=ys, x_change=self.enemy_speed, y_change=40,
+            last_shot_time=self.time, fire_interval=intervals,
+        )
+
+    def step(self, actions=()):
+        """Advance one frame; actions holds 'left'/'right' while held and 'fire'."""
+        self.frame += 1
+        self.time += FRAME_TIME
 
         # Player movement
-        player_x += player_x_change
-        player_x = max(0, min(player_x, SCREEN_WIDTH - player_rect.width))
+        player_x_change = 0
+        if 'left' in actions:
+            player_x_change -= self.player_speed
+        if 'right' in actions:
+            player_x_change += self.player_speed
+        if 'fire' in actions and self.bullet_state == "ready":
+            self.bullet_x = self.player_x + self.player_rect.width // 2 - BULLET_WIDTH // 2
+            self.bullet_y = self.player_y
+            self.bullet_state = "fire"
+        self.player_x += player_x_change
+        self.player_x = max(0, min(self.player_x, SCREEN_WIDTH - self.player_rect.width))
 
         # Update player rect position
-        player_rect.x = player_x
-        player_rect.y = player_y
-
-        # Enemy movement and actions
-        for enemy in enemies[:]:  # Copy of the list
-            # Enemy movement
-            enemy['x'] += enemy['x_change']
-            if enemy['x'] <= 0 or enemy['x'] >= SCREEN_WIDTH - enemy_image.get_width():
-                enemy['x_change'] *= -1
-                enemy['y'] += enemy['y_change']
-
-            # Enemy shoots
-            current_time = pygame.time.get_ticks()
-            if current_time - enemy['last_shot_time'] > enemy['fire_interval']:
-                enemy_bullet_x = enemy['x'] + enemy_image.get_width() // 2 - enemy_bullet_image.get_width() // 2
-                enemy_bullet_y = enemy['y'] + enemy_image.get_height()
-                enemy_bullets.append([enemy_bullet_x, enemy_bullet_y])
-                enemy['last_shot_time'] = current_time
-                enemy['fire_interval'] = random.randint(int(enemy_fire_delay * 0.5), int(enemy_fire_delay * 1.5))
-
-            # Update enemy rect
-            enemy_rect = enemy_image.get_rect(topleft=(enemy['x'], enemy['y']))
-
-            # Check collision with player
-            if enemy_rect.colliderect(player_rect):
-                player_lives -= 1
-                enemies.remove(enemy)
-                if player_lives <= 0:
-                    break
-
-            # Draw enemy
-            screen.blit(enemy_image, (enemy['x'], enemy['y']))
+        self.player_rect.x = self.player_x
+        self.player_rect.y = self.player_y
+
+        # Enemy movement, bouncing off the walls and dropping down a row
+        enemies = self.enemies
+        x, y, x_change = enemies['x'], enemies['y'], enemies['x_change']
+        x += x_change
+        bounce = (x <= 0) | (x >= SCREEN_WIDTH - ENEMY_WIDTH)
+        x_change[bounce] *= -1
+        y[bounce] += enemies['y_change'][bounce]
+
+        # Enemies whose fire timer ran out shoot
+        last_shot, interval = enemies['last_shot_time'], enemies['fire_interval']
+        shooters = (self.time - last_shot > interval).nonzero()[0]
+        if shooters.size:
+            self.enemy_bullets.extend(
+                x=x[shooters] + ENEMY_WIDTH // 2 - ENEMY_BULLET_WIDTH // 2,
+                y=y[shooters] + ENEMY_HEIGHT,
+            )
+            last_shot[shooters] = self.time
+            interval[shooters] = [self.fire_interval() for _ in range(shooters.size)]
 
         # Enemy bullets movement
-        for bullet in enemy_bullets[:]:
-            bullet[1] += enemy_bullet_speed
-            screen.blit(enemy_bullet_image, (bullet[0], bullet[1]))
-
-            # Update enemy bullet rect
-            enemy_bullet_rect = enemy_bullet_image.get_rect(topleft=(bullet[0], bullet[1]))
-
-            if bullet[1] > SCREEN_HEIGHT:
-                enemy_bullets.remove(bullet)
-            elif enemy_bullet_rect.colliderect(player_rect):
-                player_lives -= 1
-                enemy_bullets.remove(bullet)
-                if player_lives <= 0:
-                    break
+        bullets = self.enemy_bullets
+        bullets['y'] += self.enemy_bullet_speed
+        bullets.remove((bullets['y'] > SCREEN_HEIGHT).nonzero()[0])
+
+        self.enemy_grid.build(enemies['x'], enemies['y'], ENEMY_WIDTH, ENEMY_HEIGHT)
+        self.bullet_grid.build(bullets['x'], bullets['y'], ENEMY_BULLET_WIDTH, ENEMY_BULLET_HEIGHT)
+        player_box = (self.player_x, self.player_y, self.player_rect.width, self.player_rect.height)
+        # Rows are removed together at the end of the frame so the grids stay valid
+        dead_enemies = []
+        dead_bullets = []
+
+        # Enemies touching the player
+        for i in self.enemy_grid.query(*player_box):
+            self.player_lives -= 1
+            dead_enemies.append(i)
+            if self.player_lives <= 0:
+                break
+
+        # Enemy bullets hitting the player
+        for i in self.bullet_grid.query(*player_box):
+            self.player_lives -= 1
+            dead_bullets.append(i)
+            if self.player_lives <= 0:
+                break
 
         # Player bullet movement
-        if bullet_state == "fire":
-            screen.blit(bullet_image, (bullet_x, bullet_y))
-            bullet_y += bullet_speed
-
-            # Update bullet rect
-            bullet_rect = bullet_image.get_rect(topleft=(bullet_x, bullet_y))
+        if self.bullet_state == "fire":
+            self.bullet_y += self.bullet_speed
 
-            if bullet_y <= 0:
-                bullet_y = player_y
-                bullet_state = "ready"
+            if self.bullet_y <= 0:
+                self.bullet_y = self.player_y
+                self.bullet_state = "ready"
             else:
                 # Collision with enemies
-                for enemy in enemies[:]:
-                    enemy_rect = enemy_image.get_rect(topleft=(enemy['x'], enemy['y']))
-                    if bullet_rect.colliderect(enemy_rect):
-                        bullet_y = player_y
-                        bullet_state = "ready"
-                        score_value += 1
-                        enemies.remove(enemy)
-                        break  # Bullet used up
+                hits = self.enemy_grid.query(self.bullet_x, self.bullet_y, BULLET_WIDTH, BULLET_HEIGHT)
+                hits = [i for i in hits if i not in dead_enemies]
+                if hits:
+                    self.bullet_y = self.player_y
+                    self.bullet_state = "ready"
+                    self.score_value += 1
+                    dead_enemies.append(hits[0])
+
+        enemies.remove(dead_enemies)
+        bullets.remove(dead_bullets)
 
         # Check for level completion
-        if not enemies:
-            if level >= max_level:
+        if not self.enemies:
+            if self.level >= self.max_level:
                 # Victory
-                victory_text = font.render("YOU WIN!", True, (0, 255, 0))
-                screen.blit(victory_text, (SCREEN_WIDTH // 2 - victory_text.get_width() // 2, SCREEN_HEIGHT // 2))
-                pygame.display.update()
-                pygame.time.wait(3000)
-                game_over_screen(score_value)  # Show high scores
-                return
+                self.won = True
+                self.over = True
             else:
-                level += 1
+                self.level += 1
                 # Increase difficulty
-                enemy_speed += 0.5
-                enemy_bullet_speed += 0.5
+                self.enemy_speed += 0.5
+                self.enemy_bullet_speed += 0.5
                 # Adjust enemy fire delay
-                enemy_fire_delay = max(2000, int(initial_enemy_fire_delay - (level - 1) * 250))
-                num_of_enemies += 2
-                enemies = []
-                enemy_bullets = []
-                create_enemies(num_of_enemies)
+                self.enemy_fire_delay = max(2000, int(self.initial_enemy_fire_delay - (self.level - 1) * 250))
+                self.num_of_enemies += 2
+                self.enemies.clear()
+                self.enemy_bullets.clear()
+                self.create_enemies(self.num_of_enemies)
+
+        # Game Over
+        if self.player_lives <= 0:
+            self.over = True
+
+    def draw(self, surface):
+        """Draw the current frame."""
+        surface.blit(background, (0, 0))
+        enemies, bullets = self.enemies, self.enemy_bullets
+        surface.blits([(enemy_image, pos) for pos in zip(enemies['x'].tolist(), enemies['y'].tolist())], False)
+        surface.blits([(enemy_bullet_image, pos) for pos in zip(bullets['x'].tolist(), bullets['y'].tolist())], False)
+        if self.bullet_state == "fire":
+            surface.blit(bullet_image, (self.bullet_x, self.bullet_y))
 
         # Draw player
-        screen.blit(player_image, (player_x, player_y))
+        surface.blit(player_image, (self.player_x, self.player_y))
 
         # Display score and lives
-        show_text(f"Score: {score_value}", 10, 10)
-        show_text(f"Lives: {player_lives}", 10, 50)
-        show_text(f"Level: {level}", SCREEN_WIDTH - 150, 10)
+        show_text(f"Score: {self.score_value}", 10, 10)
+        show_text(f"Lives: {self.player_lives}", 10, 50)
+        show_text(f"Level: {self.level}", SCREEN_WIDTH - 150, 10)
+
+def run_headless(policy, max_frames=100000, seed=None):
+    """Play a game without a window; policy(game) returns each frame's actions."""
+    game = SpaceInvadersGame(seed)
+    while not game.over and game.frame < max_frames:
+        game.step(policy(game))
+    return game
+
+def play():
+    """Play one game and return its score."""
+    game = SpaceInvadersGame()
+    clock = pygame.time.Clock()
 
-        # Game Over
-        if player_lives <= 0:
-            pygame.display.update()
-            pygame.time.wait(1000)
-            game_over_screen(score_value)  # Show high scores
-            return
+    while not game.over:
+        # Event handling
+        actions = set()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                text_cache.clear()
+                pygame.quit()
+                sys.exit()
+
+            # Keystroke events
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                actions.add('fire')
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_LEFT]:
+            actions.add('left')
+        if keys[pygame.K_RIGHT]:
+            actions.add('right')
+
+        game.step(actions)
+        game.draw(screen)
 
         # Update the display
         pygame.display.update()
         clock.tick(60)  # 60 FPS
 
+    if game.won:
+        victory_text = text_cache.render("YOU WIN!", 'Arial', 32, (0, 255, 0))
+        screen.blit(victory_text, (SCREEN_WIDTH // 2 - victory_text.get_width() // 2, SCREEN_HEIGHT // 2))
+        pygame.display.update()
+        pygame.time.wait(3000)
+    else:
+        pygame.display.update()
+        pygame.time.wait(1000)
+    return game.score_value
+
+def main():
+    """Alternate between games and the high score screen until the window is closed."""
+    while True:
+        score = play()
+        game_over_screen(score)  # Show high scores
+
 if __name__ == '__main__':
+    init_display()
     main()
-
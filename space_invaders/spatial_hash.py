@@ -0,0 +1,48 @@
+import numpy as np
+
+class SpatialHash:
+    """Uniform grid over arrays of equally sized boxes, rebuilt in one batch.
+
+    Boxes are bucketed by the cell holding their top-left corner: build()
+    sorts the box indices by cell key, and a query binary-searches the run
+    of indices belonging to each cell around the query box. Boxes must be no
+    larger than a cell, so only the neighbouring cells can hold a box that
+    reaches into the query box.
+    """
+    def __init__(self, cell_size, width):
+        self.cell_size = cell_size
+        # One spare column on each side of the screen
+        self.columns = width // cell_size + 3
+        self.x = self.y = np.zeros(0)
+        self.w = self.h = 0
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.order)
+
+    def cell_keys(self, cx, cy):
+        cx = np.clip(cx, -1, self.columns - 2) + 1
+        cy = np.maximum(cy, -1) + 1
+        return cy * self.columns + cx
+
+    def build(self, x, y, w, h):
+        """Index boxes of size w x h at positions given by the x and y arrays."""
+        self.x, self.y, self.w, self.h = x, y, w, h
+        keys = self.cell_keys(x // self.cell_size, y // self.cell_size).astype(np.int64)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def query(self, x, y, w, h):
+        """Return the indices of the boxes overlapping the given box."""
+        size = self.cell_size
+        cx = np.arange(int(x // size) - 1, int((x + w) // size) + 1)
+        cy = np.arange(int(y // size) - 1, int((y + h) // size) + 1)
+        cells = np.unique(self.cell_keys(cx[None, :], cy[:, None]))
+        starts = np.searchsorted(self.keys, cells, side='left')
+        ends = np.searchsorted(self.keys, cells, side='right')
+        candidates = np.concatenate([self.order[s:e] for s, e in zip(starts, ends) if e > s] or [self.order[:0]])
+        bx = self.x[candidates]
+        by = self.y[candidates]
+        hit = (bx < x + w) & (x < bx + self.w) & (by < y + h) & (y < by + self.h)
+        return candidates[hit]
@@ -0,0 +1,226 @@
+"""Navigation graph over a stage's platforms and an A* route planner.
+
+Nodes are platforms. An edge is a way for a fighter to get from one
+platform onto another: walking across where two platforms touch, jumping
+up or across, or walking off an edge and falling. Jump and fall edges are
+found by simulating the fighter's flight frame by frame with the game's own
+gravity, jump speed and run speed, steering the same way the AI does, so
+every edge is one the AI can actually follow.
+"""
+import bisect
+import heapq
+import math
+
+import pygame
+
+from platform_grid import PlatformGrid
+
+# Frames a simulated jump or fall may last before it counts as missing
+MAX_AIR_FRAMES = 120
+# How far a fighter's bottom may sink into a platform and still land on it
+LANDING_DEPTH = 10
+
+def rect_round(value):
+    # Round the way pygame.Rect does when a coordinate is set to a float
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+# One way from a platform onto another; x positions are the fighter's rect.left
+class Edge:
+    __slots__ = ('source', 'target', 'kind', 'takeoff', 'landing', 'cost')
+
+    def __init__(self, source, target, kind, takeoff, landing, cost):
+        self.source = source
+        self.target = target
+        self.kind = kind  # 'walk', 'jump' or 'drop'
+        self.takeoff = takeoff
+        self.landing = landing
+        self.cost = cost  # frames
+
+class NavGraph:
+    def __init__(self, platforms, gravity, jump_speed, run_speed, fighter_size, grid=None):
+        self.rects = [platform.rect for platform in platforms]
+        self.grid = grid or PlatformGrid(platforms)
+        self.gravity = gravity
+        self.jump_speed = jump_speed
+        self.run_speed = run_speed
+        self.fighter_width, self.fighter_height = fighter_size
+
+        # Highest rise and longest flight of a jump, to skip platforms out of reach
+        self.jump_height = 0
+        self.jump_frames = 0
+        velocity = -jump_speed
+        bottom = 0
+        while bottom <= 0:
+            velocity += gravity
+            bottom = rect_round(bottom + velocity)
+            self.jump_height = max(self.jump_height, -bottom)
+            self.jump_frames += 1
+
+        # Platforms by the y of their top, sorted left to right, for support lookups
+        self.tops = {}
+        for index in sorted(range(len(self.rects)), key=lambda i: self.rects[i].left):
+            self.tops.setdefault(self.rects[index].top, []).append(index)
+        self.lefts = {top: [self.rects[i].left for i in row] for top, row in self.tops.items()}
+
+        self.edges = [[] for _ in self.rects]
+        for source in range(len(self.rects)):
+            for target in self.grid.query(self.reach(self.rects[source])):
+                if source != target:
+                    edge = self.best_edge(source, target)
+                    if edge:
+                        self.edges[source].append(edge)
+        self.routes = {}  # (start, goal) -> list of edges, or None if unreachable
+
+    def support(self, rect):
+        # Index of the platform rect is standing on, or None when airborne
+        row = self.tops.get(rect.bottom)
+        if row is None:
+            return None
+        i = bisect.bisect_left(self.lefts[rect.bottom], rect.right) - 1
+        if i >= 0 and self.rects[row[i]].right > rect.left:
+            return row[i]
+        return None
+
+    def platform_below(self, rect):
+        # Highest platform at or below rect's bottom that overlaps it horizontally
+        if rect.bottom >= self.grid.bottom:
+            return None
+        column = pygame.Rect(rect.left, rect.bottom, rect.width, self.grid.bottom - rect.bottom)
+        best = None
+        for index in self.grid.query(column):
+            platform = self.rects[index]
+            if (platform.top >= rect.bottom and platform.left < rect.right and rect.left < platform.right
+                    and (best is None or platform.top < self.rects[best].top)):
+                best = index
+        return best
+
+    def reach(self, start):
+        # Area holding every platform a fighter could jump or fall onto from start
+        depth = max(self.grid.bottom - start.top, 0)
+        fall_frames = math.sqrt(2 * depth / self.gravity) + 2
+        reach = math.ceil(self.run_speed * max(self.jump_frames, fall_frames))
+        top = start.top - self.jump_height
+        return pygame.Rect(start.left - reach, top, start.width + 2 * reach, self.grid.bottom - top)
+
+    def steer(self, left, bottom, velocity, edge):
+        # Horizontal direction (-1, 0 or 1) for a fighter in the air following edge.
+        # It heads for the landing spot but holds back rather than move under
+        # the target before it is above it, which would bump the underside on
+        # the way up, or sideways into the platform it just left.
+        offset = edge.landing - left
+        if abs(offset) * 2 < self.run_speed:
+            return 0
+        direction = 1 if offset > 0 else -1
+        width = self.fighter_width
+        next_left = left + direction * self.run_speed
+        next_bottom = rect_round(bottom + velocity + self.gravity)
+        for index in (edge.source, edge.target):
+            rect = self.rects[index]
+            if next_left < rect.right and next_left + width > rect.left and not (left < rect.right and left + width > rect.left):
+                if next_bottom > rect.top and (index == edge.target or next_bottom - self.fighter_height < rect.bottom):
+                    return 0
+        return direction
+
+    def fly(self, edge, left, bottom, velocity):
+        # Simulate following edge from the given state; return frames until landing or None
+        source = self.rects[edge.source]
+        target = self.rects[edge.target]
+        width = self.fighter_width
+        for frame in range(1, MAX_AIR_FRAMES + 1):
+            left += self.steer(left, bottom, velocity, edge) * self.run_speed
+            velocity += self.gravity
+            bottom = rect_round(bottom + velocity)
+            for rect in (source, target):
+                if (left < rect.right and left + width > rect.left
+                        and bottom > rect.top and bottom - self.fighter_height < rect.bottom):
+                    # Landed, or bumped into a platform on the way
+                    if rect is target and velocity >= 0 and bottom <= target.bottom + LANDING_DEPTH:
+                        return frame
+                    return None
+            if velocity > 0 and bottom > target.bottom + LANDING_DEPTH:
+                return None
+        return None
+
+    def best_edge(self, source, target):
+        # Cheapest way from source onto target, or None
+        start = self.rects[source]
+        end = self.rects[target]
+        width = self.fighter_width
+        speed = self.run_speed
+        centre = start.centerx - width // 2
+        gap = max(end.left - start.right, start.left - end.right, 0)
+        rise = start.top - end.top
+        if rise >= 0:
+            if rise > self.jump_height or gap > speed * self.jump_frames:
+                return None
+        elif gap > speed * (math.sqrt(2 * -rise / self.gravity) + 2):
+            return None
+        # Spots fully on the target, nearest each approach side
+        landings = (end.left, max(end.left, end.right - width))
+
+        if start.top == end.top and start.right >= end.left and end.right >= start.left:
+            landing = landings[0] if end.left > start.left else landings[1]
+            return Edge(source, target, 'walk', landing, landing, abs(landing - centre) / speed)
+
+        candidates = []
+        if end.top <= start.top:
+            # Jump from beside the target, never from underneath it
+            for takeoff, landing in ((end.left - width, landings[0]), (end.right, landings[1])):
+                takeoff = min(max(takeoff, start.left), start.right - width)
+                if takeoff + width > end.left and takeoff < end.right:
+                    continue
+                edge = Edge(source, target, 'jump', takeoff, landing, 0)
+                frames = self.fly(edge, takeoff, start.top, -self.jump_speed)
+                if frames is not None:
+                    edge.cost = abs(takeoff - centre) / speed + frames
+                    candidates.append(edge)
+        else:
+            # Walk off either end and fall, as straight down as the target allows
+            for takeoff in (start.left - width, start.right):
+                landing = min(max(takeoff, end.left), end.right - width)
+                edge = Edge(source, target, 'drop', takeoff, landing, 0)
+                frames = self.fly(edge, takeoff, start.top, 0)
+                if frames is not None:
+                    edge.cost = abs(takeoff - centre) / speed + frames
+                    candidates.append(edge)
+        return min(candidates, key=lambda edge: edge.cost, default=None)
+
+    def route(self, start, goal):
+        # Edges of the fastest route from start to goal (A*, cached), or None if unreachable
+        key = (start, goal)
+        if key not in self.routes:
+            self.routes[key] = self.search(start, goal)
+        return self.routes[key]
+
+    def search(self, start, goal):
+        rects = self.rects
+        goal_rect = rects[goal]
+
+        def estimate(index):
+            # Frames to cover the horizontal gap at full speed; never more than the real cost
+            rect = rects[index]
+            gap = max(rect.left - goal_rect.right, goal_rect.left - rect.right, 0)
+            return gap / self.run_speed
+
+        frontier = [(estimate(start), 0, start)]
+        cost = {start: 0}
+        came_by = {}
+        while frontier:
+            _, spent, index = heapq.heappop(frontier)
+            if index == goal:
+                path = []
+                while index != start:
+                    edge = came_by[index]
+                    path.append(edge)
+                    index = edge.source
+                path.reverse()
+                return path
+            if spent > cost[index]:
+                continue
+            for edge in self.edges[index]:
+                total = spent + edge.cost
+                if total < cost.get(edge.target, total + 1):
+                    cost[edge.target] = total
+                    came_by[edge.target] = edge
+                    heapq.heappush(frontier, (total + estimate(edge.target), total, edge.target))
+        return None
@@ -0,0 +1,43 @@
+"""Uniform grid over a stage's platforms for broad-phase collision queries.
+
+Platforms never move, so the grid is built once per stage: each platform
+is listed in every cell it covers, and a query collects the platforms
+listed in the cells a rect touches. Callers still test the exact overlap.
+"""
+
+# Cell size in pixels; about one fighter, so a query touches a handful of cells
+PLATFORM_CELL = 64
+
+class PlatformGrid:
+    def __init__(self, platforms, cell_size=PLATFORM_CELL):
+        self.platforms = platforms
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> indices of the platforms covering that cell
+        for index, platform in enumerate(platforms):
+            rect = platform.rect
+            for row in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+                for column in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+                    self.cells.setdefault((column, row), []).append(index)
+        self.bottom = max((platform.rect.bottom for platform in platforms), default=0)
+        # Query results by block of cells; fighters stay in the same cells for many frames
+        self.blocks = {}
+
+    def query(self, rect):
+        # Indices of the platforms near rect, in stage order
+        size = self.cell_size
+        block = (rect.left // size, (rect.right - 1) // size, rect.top // size, (rect.bottom - 1) // size)
+        found = self.blocks.get(block)
+        if found is None:
+            left, right, top, bottom = block
+            cells = self.cells
+            found = set()
+            for row in range(top, bottom + 1):
+                for column in range(left, right + 1):
+                    found.update(cells.get((column, row), ()))
+            found = self.blocks[block] = sorted(found)
+        return found
+
+    def near(self, rect):
+        # Platforms near rect, in stage order, for exact collision tests
+        platforms = self.platforms
+        return [platforms[index] for index in self.query(rect)]
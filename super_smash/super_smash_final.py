@@ -1,20 +1,36 @@
 import pygame
 import sys
+import os
 import random
+import argparse
+import json
+import time
 
-# Initialize Pygame
-pygame.init()
+# The shared text cache lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_cache
+from navigation import NavGraph
+from platform_grid import PlatformGrid
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
-# Create the game window
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Platform Fighter')
+# Simulation rate; match time advances this many milliseconds per frame
+FPS = 60
+FRAME_TIME = 1000 / FPS
 
-# Clock object
-clock = pygame.time.Clock()
+# Window and clock are created by init_display()
+screen = None
+clock = None
+
+def init_display():
+    """Create the window and clock used by the windowed game."""
+    global screen, clock
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Platform Fighter')
+    clock = pygame.time.Clock()
 
 # Define colors
 WHITE = (255, 255, 255)
@@ -22,12 +38,17 @@ BLACK = (0, 0, 0)
 LIGHT_BLUE = (173, 216, 230)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
+# Fighter colors in spawn order; the human player is always red
+FIGHTER_COLORS = [RED, BLUE, (0, 160, 0), (255, 140, 0), (160, 0, 200), (0, 170, 170), (200, 0, 120), (120, 90, 40)]
 
 # Game variables
 GRAVITY = 0.6
 MAX_JUMP_HEIGHT = 12  # Reduced jump height
 PLAYER_SPEED = 5
 ATTACK_COOLDOWN = 500  # milliseconds
+# Landing on or bumping into a platform moves a player up to about this far,
+# so platforms this close above and below are collision candidates too
+COLLISION_MARGIN = 60
 
 # Player class
 class Player:
@@ -60,28 +81,28 @@ class Player:
         self.percent = 0
         self.alive = True
 
-    def handle_keys(self):
-        keys = pygame.key.get_pressed()
+    def handle_input(self, actions, now):
+        # actions is the set of held controls, e.g. {'left', 'attack'}
         if self.controls:
-            if keys[self.controls.get('left', 0)]:
+            if 'left' in actions:
                 self.move_left = True
             else:
                 self.move_left = False
 
-            if keys[self.controls.get('right', 0)]:
+            if 'right' in actions:
                 self.move_right = True
             else:
                 self.move_right = False
 
-            if keys[self.controls.get('jump', 0)]:
+            if 'jump' in actions:
                 if self.on_ground:
                     self.is_jumping = True
                     self.velocity_y = -MAX_JUMP_HEIGHT
 
-            if keys[self.controls.get('attack', 0)]:
+            if 'attack' in actions:
                 if not self.is_attacking:
                     self.is_attacking = True
-                    self.attack_time = pygame.time.get_ticks()
+                    self.attack_time = now
 
     def move(self):
         # Horizontal movement
@@ -112,30 +133,30 @@ class Player:
                     self.rect.top = platform.rect.bottom
                     self.velocity_y = 0
 
-    def attack(self, opponent):
-        # Simple attack logic: if close enough, increase opponent's damage
+    def attack_box(self, now):
+        # Area the current attack reaches, or None once it has ended
         if self.is_attacking:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.attack_time > ATTACK_COOLDOWN:
+            if now - self.attack_time > ATTACK_COOLDOWN:
                 self.is_attacking = False
             else:
-                attack_rect = pygame.Rect(self.rect.centerx - 25, self.rect.y, 50, self.rect.height)
-                if attack_rect.colliderect(opponent.rect):
-                    # Apply knockback based on opponent's percent
-                    knockback = 5 + (opponent.percent * 0.2)  # Increased knockback scaling
-                    if self.rect.centerx < opponent.rect.centerx:
-                        opponent.rect.x += knockback
-                    else:
-                        opponent.rect.x -= knockback
-                    opponent.rect.y -= knockback * 0.5  # Apply upward knockback
-                    opponent.percent += 10  # Increase damage percentage
-                    self.is_attacking = False  # Reset attack
+                return pygame.Rect(self.rect.centerx - 25, self.rect.y, 50, self.rect.height)
+        return None
+
+    def hit(self, opponent):
+        # Apply knockback based on opponent's percent
+        knockback = 5 + (opponent.percent * 0.2)  # Increased knockback scaling
+        if self.rect.centerx < opponent.rect.centerx:
+            opponent.rect.x += knockback
+        else:
+            opponent.rect.x -= knockback
+        opponent.rect.y -= knockback * 0.5  # Apply upward knockback
+        opponent.percent += 10  # Increase damage percentage
+        self.is_attacking = False  # Reset attack
 
     def draw(self, surface):
         pygame.draw.rect(surface, self.color, self.rect)
         # Draw damage percentage
-        font = pygame.font.SysFont('Arial', 24)
-        percent_text = font.render(f"{int(self.percent)}%", True, self.color)
+        percent_text = text_cache.render(f"{int(self.percent)}%", 'Arial', 24, self.color)
         surface.blit(percent_text, (self.rect.x, self.rect.y - 30))
 
 # Platform class
@@ -148,25 +169,29 @@ class Platform:
 
 # AI Controller
 class AIController:
-    def __init__(self, player, opponent, platforms):
+    def __init__(self, player, opponent, platforms, now=0, rng=random, graph=None):
         self.player = player
         self.opponent = opponent
         self.platforms = platforms
+        # Navigation graph of the stage; controllers on the same stage can share one
+        self.graph = graph or NavGraph(platforms, GRAVITY, MAX_JUMP_HEIGHT, PLAYER_SPEED, opponent.rect.size)
         self.state = 'idle'
-        self.direction = random.choice(['left', 'right'])
-        self.change_direction_time = pygame.time.get_ticks()
+        self.direction = rng.choice(['left', 'right'])
+        self.change_direction_time = now
         self.jump_cooldown = 0
-        self.idle_time = pygame.time.get_ticks()
+        self.idle_time = now
         self.idle_duration = 1000  # AI waits for 1 second before moving
+        # Route to the platform the player is on, kept until that platform changes
+        self.goal = None
+        self.route = []
+        self.edge = None  # edge being followed through the air
 
-    def update(self):
-        current_time = pygame.time.get_ticks()
-
+    def update(self, now):
         # Idle state at the beginning
         if self.state == 'idle':
             self.opponent.move_left = False
             self.opponent.move_right = False
-            if current_time - self.idle_time > self.idle_duration:
+            if now - self.idle_time > self.idle_duration:
                 self.state = 'chase'
             return
 
@@ -177,19 +202,61 @@ class AIController:
         distance = abs(self.player.rect.centerx - self.opponent.rect.centerx)
         if distance < 60 and not self.opponent.is_attacking:
             self.opponent.is_attacking = True
-            self.opponent.attack_time = pygame.time.get_ticks()
+            self.opponent.attack_time = now
 
     def chase_player(self):
-        # Determine vertical relation
-        if self.opponent.rect.bottom < self.player.rect.top - 10:
-            # Player is below AI
-            self.move_to_lower_platform()
-        elif self.opponent.rect.top > self.player.rect.bottom + 10:
-            # Player is above AI
-            self.move_to_higher_platform()
-        else:
-            # Player is on the same level
+        graph = self.graph
+        here = graph.support(self.opponent.rect)
+        if here is None:
+            # In the air: steer towards the landing spot of the edge being followed
+            if self.edge:
+                self.set_direction(graph.steer(
+                    self.opponent.rect.left, self.opponent.rect.bottom, self.opponent.velocity_y, self.edge
+                ))
+            return
+        self.edge = None
+
+        # The platform the player stands on or is falling towards
+        goal = graph.support(self.player.rect)
+        if goal is None:
+            goal = graph.platform_below(self.player.rect)
+        if goal is None:
+            goal = self.goal
+        if goal != self.goal or not self.route or self.route[0].source != here:
+            self.goal = goal
+            self.route = list(graph.route(here, goal) or []) if goal is not None else []
+
+        if not self.route:
+            # Player is on the same level (or out of reach)
             self.move_horizontally_towards_player()
+            return
+
+        # Walk to where the next edge starts, then jump
+        edge = self.route[0]
+        offset = edge.takeoff - self.opponent.rect.left
+        if edge.kind == 'drop':
+            # Drop edges start just past the end of the platform; walk that way until off it
+            self.edge = edge
+            self.set_direction(1 if edge.takeoff > graph.rects[here].centerx else -1)
+        elif abs(offset) * 2 >= PLAYER_SPEED:
+            self.set_direction(1 if offset > 0 else -1)
+        elif edge.kind == 'jump':
+            self.set_direction(0)
+            if self.opponent.on_ground and not self.opponent.is_jumping:
+                self.opponent.is_jumping = True
+                self.opponent.velocity_y = -MAX_JUMP_HEIGHT
+                self.edge = edge
+                self.route.pop(0)
+                self.set_direction(graph.steer(
+                    self.opponent.rect.left, self.opponent.rect.bottom, self.opponent.velocity_y, edge
+                ))
+        else:
+            self.set_direction(0)
+            self.route.pop(0)
+
+    def set_direction(self, direction):
+        self.opponent.move_left = direction < 0
+        self.opponent.move_right = direction > 0
 
     def move_horizontally_towards_player(self):
         # Move towards the player
@@ -206,60 +273,6 @@ class AIController:
         if not self.can_move('right') and self.opponent.move_right:
             self.opponent.move_right = False
 
-    def move_to_higher_platform(self):
-        # Find platforms above the AI
-        platforms_above = [p for p in self.platforms if p.rect.bottom <= self.opponent.rect.top]
-        if platforms_above:
-            # Find the closest platform above
-            target_platform = min(platforms_above, key=lambda p: abs(p.rect.centerx - self.player.rect.centerx))
-            # Move towards the platform's position
-            if self.opponent.rect.centerx < target_platform.rect.centerx:
-                self.opponent.move_left = False
-                self.opponent.move_right = True
-            else:
-                self.opponent.move_left = True
-                self.opponent.move_right = False
-
-            # Jump if underneath the platform
-            if self.opponent.on_ground and not self.opponent.is_jumping:
-                self.opponent.is_jumping = True
-                self.opponent.velocity_y = -MAX_JUMP_HEIGHT
-        else:
-            # No platforms above, move towards player horizontally
-            self.move_horizontally_towards_player()
-
-    def move_to_lower_platform(self):
-        # Find platforms below the AI
-        platforms_below = [p for p in self.platforms if p.rect.top >= self.opponent.rect.bottom]
-        if platforms_below:
-            # Find the closest platform below
-            target_platform = min(platforms_below, key=lambda p: abs(p.rect.centerx - self.player.rect.centerx))
-            # Move towards the platform's position
-            if self.opponent.rect.centerx < target_platform.rect.centerx:
-                self.opponent.move_left = False
-                self.opponent.move_right = True
-            else:
-                self.opponent.move_left = True
-                self.opponent.move_right = False
-
-            # Drop down if at the edge of the platform
-            if self.opponent.on_ground and self.is_at_platform_edge():
-                self.opponent.velocity_y += GRAVITY  # Apply gravity to fall off the platform
-        else:
-            # No platforms below, move towards player horizontally
-            self.move_horizontally_towards_player()
-
-    def is_at_platform_edge(self):
-        # Check if AI is at the edge of the platform
-        for platform in self.platforms:
-            if self.opponent.rect.bottom == platform.rect.top:
-                edge_margin = 5
-                if self.opponent.move_left and self.opponent.rect.left <= platform.rect.left + edge_margin:
-                    return True
-                if self.opponent.move_right and self.opponent.rect.right >= platform.rect.right - edge_margin:
-                    return True
-        return False
-
     def can_move(self, direction):
         # Predict next position
         next_rect = self.opponent.rect.copy()
@@ -269,15 +282,22 @@ class AIController:
             next_rect.x += PLAYER_SPEED
 
         # Check if next position keeps the AI on the platform
-        for platform in self.platforms:
-            if (next_rect.bottom == platform.rect.top and
-                platform.rect.left <= next_rect.centerx <= platform.rect.right):
-                return True
-        return False
-
-def main():
-    # Create platforms
-    platforms = [
+        here = self.graph.support(self.opponent.rect)
+        if here is None:
+            return False
+        platform = self.graph.rects[here]
+        return platform.left <= next_rect.centerx <= platform.right
+
+# Define player controls
+PLAYER_CONTROLS = {
+    'left': pygame.K_LEFT,
+    'right': pygame.K_RIGHT,
+    'jump': pygame.K_UP,
+    'attack': pygame.K_SPACE,
+}
+
+def create_platforms():
+    return [
         Platform(200, 500, 400, 20),
         Platform(100, 400, 150, 20),
         Platform(550, 400, 150, 20),
@@ -286,24 +306,235 @@ def main():
         Platform(450, 200, 100, 20),  # Added higher platform
     ]
 
-    # Define player controls
-    player_controls = {
-        'left': pygame.K_LEFT,
-        'right': pygame.K_RIGHT,
-        'jump': pygame.K_UP,
-        'attack': pygame.K_SPACE,
-    }
+# Where the first two fighters start; the rest start on the platforms in turn
+SPAWN_POINTS = [(300, 500 - 60), (550, 400 - 60)]
+
+def spawn_points(platforms, count):
+    points = SPAWN_POINTS[:count]
+    for i in range(len(points), count):
+        platform = platforms[i % len(platforms)].rect
+        points.append((platform.centerx - 20, platform.top - 60))
+    return points
+
+def resolve_attacks(fighters, now):
+    # Test every active attack against every other fighter in one sweep-and-prune
+    # pass: attack boxes and bodies are sorted by their left edge, and each box is
+    # only compared with the boxes of the other kind whose x range it overlaps.
+    # All boxes are taken before any knockback, so trades hit both ways.
+    boxes = []
+    for index, fighter in enumerate(fighters):
+        if fighter.alive:
+            boxes.append((fighter.rect.left, False, index, fighter.rect))
+            attack = fighter.attack_box(now)
+            if attack:
+                boxes.append((attack.left, True, index, attack))
+    boxes.sort(key=lambda box: box[0])
+
+    targets = {}  # attacker index -> the first fighter (in fighter order) it hits
+    open_attacks = []
+    open_bodies = []
+    for left, is_attack, index, rect in boxes:
+        open_attacks = [box for box in open_attacks if box[3].right > left]
+        open_bodies = [box for box in open_bodies if box[3].right > left]
+        if is_attack:
+            pairs = [(index, other) for _, _, other, body in open_bodies if other != index and rect.colliderect(body)]
+            open_attacks.append((left, is_attack, index, rect))
+        else:
+            pairs = [(attacker, index) for _, _, attacker, box in open_attacks if attacker != index and box.colliderect(rect)]
+            open_bodies.append((left, is_attack, index, rect))
+        for attacker, target in pairs:
+            targets[attacker] = min(target, targets.get(attacker, target))
+
+    for attacker in sorted(targets):
+        fighters[attacker].hit(fighters[targets[attacker]])
+
+# Fewest fighters a match can have
+MIN_FIGHTERS = 2
+
+# One round between two or more fighters, advanced one frame at a time.
+# With a human, fighter 0 is theirs and the rest are AI; without one, all are AI.
+class Match:
+    def __init__(self, seed=None, fighters=2, human=True):
+        if fighters < MIN_FIGHTERS:
+            raise ValueError(f"A match needs at least {MIN_FIGHTERS} fighters, got {fighters}")
+        self.rng_seed = seed
+        self.rng = random.Random(seed)
+        self.frame = 0
+        self.platforms = create_platforms()
+        self.platform_grid = PlatformGrid(self.platforms)
+
+        # Create fighters
+        self.fighters = [
+            Player(x, y, FIGHTER_COLORS[i % len(FIGHTER_COLORS)], PLAYER_CONTROLS if human and i == 0 else {})
+            for i, (x, y) in enumerate(spawn_points(self.platforms, fighters))
+        ]
+        self.player = self.fighters[0] if human else None
+
+        # Create AI controllers, sharing one navigation graph of the stage
+        graph = NavGraph(self.platforms, GRAVITY, MAX_JUMP_HEIGHT, PLAYER_SPEED, self.fighters[-1].rect.size, self.platform_grid)
+        self.ai_controllers = [
+            AIController(self.nearest_opponent(fighter), fighter, self.platforms, self.now(), self.rng, graph)
+            for fighter in self.fighters if fighter is not self.player
+        ]
+        self.game_active = True
+        self.game_over_message = ""
+
+    def now(self):
+        # Simulated milliseconds since the match started
+        return self.frame * FRAME_TIME
+
+    def nearest_opponent(self, fighter):
+        # Closest other fighter still in the match, or None
+        x, y = fighter.rect.center
+        others = [other for other in self.fighters if other is not fighter and other.alive]
+        return min(others, key=lambda other: (other.rect.centerx - x) ** 2 + (other.rect.centery - y) ** 2, default=None)
+
+    def step(self, actions):
+        # actions is the set of controls the human player holds this frame
+        self.frame += 1
+        now = self.now()
+        fighters = [fighter for fighter in self.fighters if fighter.alive]
+
+        # Player input
+        if self.player:
+            self.player.handle_input(actions, now)
+
+        # AI logic; each AI chases whoever is closest
+        for controller in self.ai_controllers:
+            if controller.opponent.alive:
+                controller.player = self.nearest_opponent(controller.opponent) or controller.player
+                controller.update(now)
+
+        # Move fighters and check collisions against the platforms near each one
+        for fighter in fighters:
+            fighter.move()
+            fighter.check_collisions(self.platform_grid.near(fighter.rect.inflate(0, COLLISION_MARGIN * 2)))
+
+        # Attacks
+        resolve_attacks(self.fighters, now)
+
+        # Check if fighters are off-screen (knocked out)
+        for fighter in fighters:
+            if fighter.rect.top > SCREEN_HEIGHT or fighter.rect.right < 0 or fighter.rect.left > SCREEN_WIDTH:
+                fighter.alive = False
+
+        standing = [fighter for fighter in self.fighters if fighter.alive]
+        if self.player and not self.player.alive:
+            self.game_active = False
+            self.game_over_message = "You Lose! Press 'R' to Play Again"
+        elif len(standing) <= 1:
+            self.game_active = False
+            if self.player:
+                self.game_over_message = "You Win! Press 'R' to Play Again"
+            elif standing:
+                self.game_over_message = f"Fighter {self.fighters.index(standing[0]) + 1} Wins! Press 'R' to Play Again"
+            else:
+                self.game_over_message = "Draw! Press 'R' to Play Again"
+
+    def draw(self, surface):
+        surface.fill(WHITE)
 
-    # Create players
-    player = Player(300, 500 - 60, RED, player_controls)
-    ai_player = Player(550, 400 - 60, BLUE, {})  # Adjusted starting position
+        # Draw platforms
+        for platform in self.platforms:
+            platform.draw(surface)
+
+        # Draw fighters
+        for fighter in self.fighters:
+            if fighter.alive:
+                fighter.draw(surface)
+
+def run_headless(policy, max_frames=100000, seed=None, fighters=2, human=True):
+    # Play a match without a window; policy(match) returns the player's held controls
+    match = Match(seed, fighters, human)
+    while match.game_active and match.frame < max_frames:
+        match.step(policy(match) if human else ())
+    return match
+
+# Bit used for each control in recorded input
+INPUT_BITS = {'left': 1, 'right': 2, 'jump': 4, 'attack': 8}
+# Bumped whenever the simulation changes, since old recordings would replay differently
+RECORDING_VERSION = 4
+
+def encode_input(actions):
+    mask = 0
+    for action in actions:
+        mask |= INPUT_BITS[action]
+    return mask
+
+def decode_input(mask):
+    return {action for action, bit in INPUT_BITS.items() if mask & bit}
+
+# The seed, fighter count and per-frame human input of one match; enough to re-simulate it exactly
+class Recording:
+    def __init__(self, seed, inputs=None, fighters=2):
+        self.seed = seed
+        self.fighters = fighters
+        self.inputs = inputs if inputs is not None else []  # one input mask per frame
+
+    def record(self, actions):
+        self.inputs.append(encode_input(actions))
+
+    def save(self, path):
+        # Store the input as [mask, repeat count] runs, since held keys repeat for many frames
+        runs = []
+        for mask in self.inputs:
+            if runs and runs[-1][0] == mask:
+                runs[-1][1] += 1
+            else:
+                runs.append([mask, 1])
+        with open(path, 'w') as f:
+            json.dump({
+                'version': RECORDING_VERSION, 'seed': self.seed, 'fighters': self.fighters,
+                'frames': len(self.inputs), 'inputs': runs,
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {data.get('version')}")
+        inputs = []
+        for mask, count in data['inputs']:
+            inputs.extend([mask] * count)
+        return cls(data['seed'], inputs, data['fighters'])
+
+def replay(recording):
+    # Re-simulate a recorded match as fast as possible, without rendering
+    match = Match(recording.seed, recording.fighters)
+    for mask in recording.inputs:
+        if not match.game_active:
+            break
+        match.step(decode_input(mask))
+    return match
+
+def match_state(match):
+    # Summary of a match used to compare a replay against the reported outcome
+    return {
+        'frame': match.frame,
+        'game_active': match.game_active,
+        'result': match.game_over_message,
+        'players': [
+            {
+                'x': fighter.rect.x,
+                'y': fighter.rect.y,
+                'velocity_y': fighter.velocity_y,
+                'percent': fighter.percent,
+                'alive': fighter.alive,
+            }
+            for fighter in match.fighters
+        ],
+    }
 
-    # Create AI controller
-    ai_controller = AIController(player, ai_player, platforms)
+def keyboard_actions(controls):
+    # Translate the keys currently held into control names
+    keys = pygame.key.get_pressed()
+    return {action for action, key in controls.items() if keys[key]}
 
+def main(record_path=None, fighters=2):
+    match = Match(random.randrange(2 ** 32), fighters)
+    recording = Recording(match.rng_seed, fighters=fighters)
     running = True
-    game_active = True
-    game_over_message = ""
 
     while running:
         clock.tick(60)  # 60 FPS
@@ -314,77 +545,53 @@ def main():
 
             # Handle play again option
             if event.type == pygame.KEYDOWN:
-                if not game_active:
+                if not match.game_active:
                     if event.key == pygame.K_r:
                         # Reset game
-                        player.reset()
-                        ai_player.reset()
-                        player.rect.x = 300
-                        player.rect.y = 500 - 60
-                        ai_player.rect.x = 550
-                        ai_player.rect.y = 400 - 60
-                        ai_controller = AIController(player, ai_player, platforms)
-                        game_active = True
-                        game_over_message = ""
-
-        if game_active:
-            screen.fill(WHITE)
-
-            # Player input
-            player.handle_keys()
-
-            # AI logic
-            ai_controller.update()
-
-            # Move players
-            player.move()
-            ai_player.move()
-
-            # Check collisions
-            player.check_collisions(platforms)
-            ai_player.check_collisions(platforms)
-
-            # Attacks
-            player.attack(ai_player)
-            ai_player.attack(player)
-
-            # Draw platforms
-            for platform in platforms:
-                platform.draw(screen)
-
-            # Draw players
-            player.draw(screen)
-            ai_player.draw(screen)
-
-            # Check if players are off-screen (knocked out)
-            if player.rect.top > SCREEN_HEIGHT or player.rect.right < 0 or player.rect.left > SCREEN_WIDTH:
-                player.alive = False
-            if ai_player.rect.top > SCREEN_HEIGHT or ai_player.rect.right < 0 or ai_player.rect.left > SCREEN_WIDTH:
-                ai_player.alive = False
-
-            if not player.alive:
-                game_active = False
-                game_over_message = "You Lose! Press 'R' to Play Again"
-            elif not ai_player.alive:
-                game_active = False
-                game_over_message = "You Win! Press 'R' to Play Again"
-
+                        match = Match(random.randrange(2 ** 32), fighters)
+                        recording = Recording(match.rng_seed, fighters=fighters)
+
+        if match.game_active:
+            actions = keyboard_actions(match.player.controls)
+            recording.record(actions)
+            match.step(actions)
+            match.draw(screen)
             pygame.display.flip()
+            if not match.game_active and record_path:
+                recording.save(record_path)
 
         else:
             # Game is not active, display game over screen
             screen.fill(WHITE)
-            game_over(screen, game_over_message)
+            game_over(screen, match.game_over_message)
             pygame.display.flip()
 
+    if record_path and match.game_active:
+        recording.save(record_path)
+    text_cache.clear()
     pygame.quit()
     sys.exit()
 
 def game_over(surface, message):
-    font = pygame.font.SysFont('Arial', 48)
-    text = font.render(message, True, BLACK)
+    text = text_cache.render(message, 'Arial', 48, BLACK)
     surface.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - text.get_height() // 2))
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Platform Fighter')
+    parser.add_argument('--record', metavar='PATH', help='save the input of the latest match to PATH')
+    parser.add_argument('--replay', metavar='PATH', help='re-simulate a recorded match without a window and print its final state')
+    parser.add_argument('--fighters', type=int, default=2, help='fighters in the match, the first one yours')
+    args = parser.parse_args()
+    if args.fighters < MIN_FIGHTERS:
+        parser.error(f"--fighters must be at least {MIN_FIGHTERS}")
+    if args.replay:
+        recording = Recording.load(args.replay)
+        start = time.perf_counter()
+        match = replay(recording)
+        elapsed = time.perf_counter() - start
+        print(json.dumps(match_state(match), indent=2))
+        print(f"Replayed {match.frame} frames in {elapsed:.3f}s ({match.frame / max(elapsed, 1e-9):.0f} frames/s)")
+    else:
+        init_display()
+        main(args.record, args.fighters)
 
@@ -1,8 +1,12 @@
 import pygame
 import random
+import os
+import sys
 
-# Initialize Pygame
-pygame.init()
+# The shared text cache lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_cache
+import tetris_ai
 
 # Screen dimensions
 screen_width = 400
@@ -17,6 +21,18 @@ block_size = 30
 top_left_x = (screen_width - play_width) // 2
 top_left_y = screen_height - play_height
 
+# Simulation rate; headless runs advance this many milliseconds per frame
+FPS = 60
+FRAME_TIME = 1000 / FPS
+
+# Keyboard bindings for the player's actions
+KEY_ACTIONS = {
+    pygame.K_LEFT: 'left',
+    pygame.K_RIGHT: 'right',
+    pygame.K_DOWN: 'down',
+    pygame.K_UP: 'rotate',
+}
+
 # Shapes and their rotations
 S = [['.....',
       '.....',
@@ -133,260 +149,376 @@ shape_colors = [
     (128, 0, 128)   # Purple
 ]
 
+class Rotation:
+    """Precomputed cell offsets, bounding box and row masks of one rotation."""
+    __slots__ = ('cells', 'min_x', 'max_x', 'min_y', 'max_y', 'row_masks')
+
+    def __init__(self, format):
+        # Offsets are relative to the piece origin, which sits at column 2, row 4
+        self.cells = tuple(
+            (j - 2, i - 4)
+            for i, line in enumerate(format)
+            for j, column in enumerate(line)
+            if column == '0'
+        )
+        xs = [dx for dx, _ in self.cells]
+        ys = [dy for _, dy in self.cells]
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+        # One (row offset, mask) pair per occupied row; bit k is column min_x + k
+        masks = {}
+        for dx, dy in self.cells:
+            masks[dy] = masks.get(dy, 0) | 1 << (dx - self.min_x)
+        self.row_masks = tuple(sorted(masks.items()))
+
+# Rotation tables for every shape, built once at import; indexed by shape id
+shape_rotations = [tuple(Rotation(format) for format in shape) for shape in shapes]
+
 class Piece:
     """Represents a Tetris piece."""
-    def __init__(self, x, y, shape):
+    def __init__(self, x, y, shape_id):
         self.x = x
         self.y = y
-        self.shape = shape
-        self.color = shape_colors[shapes.index(shape)]
+        self.shape_id = shape_id
+        self.shape = shapes[shape_id]
+        self.rotations = shape_rotations[shape_id]
+        self.color = shape_colors[shape_id]
         self.rotation = 0
 
-def create_grid(locked_positions={}):
-    """Create a grid with locked positions."""
-    grid = [[(0, 0, 0) for _ in range(10)] for _ in range(20)]
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            if (j, i) in locked_positions:
-                grid[i][j] = locked_positions[(j, i)]
-    return grid
+    def current_rotation(self):
+        """Return the precomputed table for the current rotation."""
+        return self.rotations[self.rotation % len(self.rotations)]
+
+class Board:
+    """Locked cells stored as one bitmask per row plus a color plane."""
+    def __init__(self, width=10, height=20):
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        # Bit j of rows[i] is set when cell (j, i) is occupied
+        self.rows = [0] * height
+        self.colors = [[(0, 0, 0)] * width for _ in range(height)]
+        # Set when a piece locks while still partly above the top
+        self.topped_out = False
+
+    def fits(self, rotation, x, y):
+        """Check that a rotation placed at (x, y) is inside the board and unoccupied."""
+        left = x + rotation.min_x
+        if left < 0 or x + rotation.max_x >= self.width or y + rotation.max_y >= self.height:
+            return False
+        rows = self.rows
+        for dy, mask in rotation.row_masks:
+            row = y + dy
+            if row > -1 and rows[row] & (mask << left):
+                return False
+        return True
+
+    def lock(self, positions, color):
+        """Lock the given positions into the board."""
+        for x, y in positions:
+            if y > -1:
+                self.rows[y] |= 1 << x
+                self.colors[y][x] = color
+            else:
+                self.topped_out = True
+
+    def clear_full_rows(self):
+        """Remove completed rows and return how many were cleared."""
+        kept = [i for i in range(self.height) if self.rows[i] != self.full_row]
+        cleared = self.height - len(kept)
+        if cleared:
+            self.rows = [0] * cleared + [self.rows[i] for i in kept]
+            self.colors = (
+                [[(0, 0, 0)] * self.width for _ in range(cleared)] +
+                [self.colors[i] for i in kept]
+            )
+        return cleared
 
 def convert_shape_format(shape):
     """Convert the shape format for the grid."""
-    positions = []
-    format = shape.shape[shape.rotation % len(shape.shape)]
-    for i, line in enumerate(format):
-        row = list(line)
-        for j, column in enumerate(row):
-            if column == '0':
-                positions.append((shape.x + j - 2, shape.y + i - 4))
-    return positions
-
-def valid_space(shape, grid):
+    x, y = shape.x, shape.y
+    return [(x + dx, y + dy) for dx, dy in shape.current_rotation().cells]
+
+def valid_space(shape, board):
     """Check if the space is valid for movement."""
-    accepted_positions = [
-        [(j, i) for j in range(10) if grid[i][j] == (0, 0, 0)]
-        for i in range(20)
-    ]
-    accepted_positions = [pos for sublist in accepted_positions for pos in sublist]
-    formatted = convert_shape_format(shape)
-    for pos in formatted:
-        if pos not in accepted_positions and pos[1] > -1:
-            return False
-    return True
+    return board.fits(shape.current_rotation(), shape.x, shape.y)
 
-def check_lost(positions):
+def check_lost(board):
     """Check if the game is lost."""
-    for pos in positions:
-        x, y = pos
-        if y < 1:
-            return True
-    return False
+    return board.topped_out or board.rows[0] != 0
 
-def get_shape():
+def get_shape(rng=random):
     """Get a random new shape."""
-    return Piece(5, 0, random.choice(shapes))
+    return Piece(5, 0, rng.randrange(len(shapes)))
 
 def draw_text_middle(surface, text, size, color):
-    """Draw text in the middle of the surface."""
-    font = pygame.font.SysFont('comicsans', size, bold=True)
-    label = font.render(text, True, color)
-    surface.blit(
+    """Draw text in the middle of the surface and return the area it covers."""
+    label = text_cache.render(text, 'comicsans', size, color, bold=True)
+    return surface.blit(
         label,
         (top_left_x + play_width / 2 - label.get_width() / 2,
          top_left_y + play_height / 2 - label.get_height() / 2)
     )
 
-def draw_grid(surface, grid):
+def draw_grid(surface, board):
     """Draw the grid lines."""
     sx = top_left_x
     sy = top_left_y
-    for i in range(len(grid)):
-        # Horizontal lines
+    # Horizontal lines
+    for i in range(board.height):
         pygame.draw.line(
             surface, (128, 128, 128),
             (sx, sy + i * block_size),
             (sx + play_width, sy + i * block_size)
         )
-        for j in range(len(grid[i])):
-            # Vertical lines
-            pygame.draw.line(
-                surface, (128, 128, 128),
-                (sx + j * block_size, sy),
-                (sx + j * block_size, sy + play_height)
-            )
-
-def clear_rows(grid, locked):
-    """Clear completed rows from the grid."""
-    inc = 0
-    for i in range(len(grid) - 1, -1, -1):
-        if (0, 0, 0) not in grid[i]:
-            inc += 1
-            ind = i
-            for j in range(len(grid[i])):
-                try:
-                    del locked[(j, i)]
-                except:
-                    continue
-    if inc > 0:
-        # Shift rows down
-        for key in sorted(list(locked), key=lambda x: x[1])[::-1]:
-            x, y = key
-            if y < ind:
-                new_key = (x, y + inc)
-                locked[new_key] = locked.pop(key)
-
-def draw_next_shape(shape, surface):
-    """Draw the next shape on the side."""
-    font = pygame.font.SysFont('comicsans', 30)
-    label = font.render('Next Shape', True, (255, 255, 255))
-    sx = top_left_x + play_width + 50
-    sy = top_left_y + play_height / 2 - 100
-    format = shape.shape[shape.rotation % len(shape.shape)]
-    for i, line in enumerate(format):
-        for j, column in enumerate(list(line)):
-            if column == '0':
-                pygame.draw.rect(
-                    surface, shape.color,
-                    (sx + j * block_size, sy + i * block_size, block_size, block_size)
-                )
-    surface.blit(label, (sx + 10, sy - 30))
-
-def draw_window(surface, grid, score=0):
-    """Draw the main game window."""
-    surface.fill((0, 0, 0))
-    # Title
-    font = pygame.font.SysFont('comicsans', 60)
-    label = font.render('Tetris', True, (255, 255, 255))
-    surface.blit(
-        label,
-        (top_left_x + play_width / 2 - label.get_width() / 2, 30)
-    )
-    # Current score
-    font = pygame.font.SysFont('comicsans', 30)
-    label = font.render(f'Score: {score}', True, (255, 255, 255))
-    sx = top_left_x + play_width + 50
-    sy = top_left_y + play_height / 2 - 150
-    surface.blit(label, (sx + 20, sy + 160))
-    # Draw grid
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            pygame.draw.rect(
-                surface, grid[i][j],
-                (top_left_x + j * block_size, top_left_y + i * block_size, block_size, block_size)
-            )
-    # Grid and border
-    draw_grid(surface, grid)
-    pygame.draw.rect(
-        surface, (255, 0, 0),
-        (top_left_x, top_left_y, play_width, play_height), 5
-    )
+    # Vertical lines
+    for j in range(board.width):
+        pygame.draw.line(
+            surface, (128, 128, 128),
+            (sx + j * block_size, sy),
+            (sx + j * block_size, sy + play_height)
+        )
 
-def main():
-    """Main game loop."""
-    global win
-    locked_positions = {}
-    grid = create_grid(locked_positions)
-    change_piece = False
-    run = True
-    current_piece = get_shape()
-    next_piece = get_shape()
-    clock = pygame.time.Clock()
-    fall_time = 0
-    fall_speed = 0.5
-    level_time = 0
-    score = 0
+def clear_rows(board):
+    """Clear completed rows from the board and return how many were cleared."""
+    return board.clear_full_rows()
+
+class Renderer:
+    """Draws the game window, redrawing only what changed since the last frame.
+
+    The title, 'Next Shape' label, grid lines and border are drawn once onto
+    a cached background. Each frame only the cells whose color changed are
+    refilled, with the grid and border blitted back over them from a
+    transparent overlay, and only those rectangles are sent to the display.
+    """
+    def __init__(self, surface, board):
+        self.surface = surface
+        self.width = board.width
+        self.height = board.height
+        # Grid lines and border on a transparent layer
+        self.overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+        draw_grid(self.overlay, board)
+        pygame.draw.rect(
+            self.overlay, (255, 0, 0),
+            (top_left_x, top_left_y, play_width, play_height), 5
+        )
+        # Everything that never changes, with an empty board
+        self.background = pygame.Surface(surface.get_size())
+        self.background.fill((0, 0, 0))
+        label = text_cache.render('Tetris', 'comicsans', 60, (255, 255, 255))
+        self.background.blit(label, (top_left_x + play_width / 2 - label.get_width() / 2, 30))
+        self.background.fill((0, 0, 0), (top_left_x, top_left_y, play_width, play_height))
+        self.background.blit(self.overlay, (0, 0))
+        label = text_cache.render('Next Shape', 'comicsans', 30, (255, 255, 255))
+        self.next_x = top_left_x + play_width + 50
+        self.next_y = top_left_y + play_height / 2 - 100
+        self.background.blit(label, (self.next_x + 10, self.next_y - 30))
+        self.next_rect = pygame.Rect(self.next_x, self.next_y, 5 * block_size, 5 * block_size)
+        self.score_pos = (top_left_x + play_width + 70, top_left_y + play_height / 2 + 10)
+
+        # What is on screen; None forces a full redraw on the next frame
+        self.cells = None
+        self.score = None
+        self.score_rect = None
+        self.next_key = None
+
+    def invalidate(self):
+        """Redraw everything on the next frame, e.g. after drawing over the window."""
+        self.cells = None
+
+    def cell_rect(self, index):
+        y, x = divmod(index, self.width)
+        return pygame.Rect(top_left_x + x * block_size, top_left_y + y * block_size, block_size, block_size)
+
+    def draw(self, board, piece_positions=(), piece_color=(0, 0, 0), score=0, next_piece=None):
+        """Draw a frame and update the changed parts of the display."""
+        surface = self.surface
+        dirty = []
+        if self.cells is None:
+            surface.blit(self.background, (0, 0))
+            dirty.append(surface.get_rect())
+            self.cells = [(0, 0, 0)] * (self.width * self.height)
+            self.score = self.score_rect = self.next_key = None
+
+        # Cells that changed color, with the falling piece on top
+        colors = [color for row in board.colors for color in row]
+        for x, y in piece_positions:
+            if y > -1:
+                colors[y * self.width + x] = piece_color
+        cells = self.cells
+        for index, color in enumerate(colors):
+            if color != cells[index]:
+                cells[index] = color
+                rect = self.cell_rect(index)
+                surface.fill(color, rect)
+                surface.blit(self.overlay, rect, rect)
+                dirty.append(rect)
+
+        # Score label
+        if score != self.score:
+            if self.score_rect:
+                surface.blit(self.background, self.score_rect, self.score_rect)
+                dirty.append(self.score_rect)
+            label = text_cache.render(f'Score: {score}', 'comicsans', 30, (255, 255, 255))
+            self.score = score
+            self.score_rect = surface.blit(label, self.score_pos)
+            dirty.append(self.score_rect)
+
+        # Next piece preview
+        if next_piece is not None:
+            key = (next_piece.shape_id, next_piece.rotation)
+            if key != self.next_key:
+                self.next_key = key
+                surface.blit(self.background, self.next_rect, self.next_rect)
+                for dx, dy in next_piece.current_rotation().cells:
+                    pygame.draw.rect(
+                        surface, next_piece.color,
+                        (self.next_x + (dx + 2) * block_size, self.next_y + (dy + 4) * block_size,
+                         block_size, block_size)
+                    )
+                dirty.append(self.next_rect)
+
+        if dirty:
+            pygame.display.update(dirty)
+
+class TetrisGame:
+    """Tetris state that can be advanced with or without a window."""
+    def __init__(self, seed=None, fall_speed=0.5):
+        self.rng = random.Random(seed)
+        self.board = Board()
+        self.current_piece = get_shape(self.rng)
+        self.next_piece = get_shape(self.rng)
+        self.change_piece = False
+        self.fall_time = 0
+        self.fall_speed = fall_speed  # seconds per row, shrinking over time
+        self.level_time = 0
+        self.score = 0
+        self.lines_cleared = 0
+        self.pieces_placed = 0
+        self.frame = 0
+        self.over = False
+
+    def move(self, dx=0, dy=0, rotation=0):
+        """Move the current piece unless the destination is blocked."""
+        piece = self.current_piece
+        piece.x += dx
+        piece.y += dy
+        piece.rotation += rotation
+        if valid_space(piece, self.board):
+            return True
+        piece.x -= dx
+        piece.y -= dy
+        piece.rotation -= rotation
+        return False
 
-    while run:
-        grid = create_grid(locked_positions)
-        fall_time += clock.get_rawtime()
-        level_time += clock.get_rawtime()
-        clock.tick()
+    def step(self, actions=(), elapsed=FRAME_TIME):
+        """Advance one frame given the player's actions and the elapsed milliseconds."""
+        self.frame += 1
+        self.fall_time += elapsed
+        self.level_time += elapsed
 
         # Increase speed over time
-        if level_time / 1000 > 5:
-            level_time = 0
-            if fall_speed > 0.15:
-                fall_speed -= 0.005
+        if self.level_time / 1000 > 5:
+            self.level_time = 0
+            if self.fall_speed > 0.15:
+                self.fall_speed -= 0.005
 
         # Piece falls
-        if fall_time / 1000 > fall_speed:
-            fall_time = 0
-            current_piece.y += 1
-            if not(valid_space(current_piece, grid)) and current_piece.y > 0:
-                current_piece.y -= 1
-                change_piece = True
+        if self.fall_time / 1000 > self.fall_speed:
+            self.fall_time = 0
+            self.current_piece.y += 1
+            if not(valid_space(self.current_piece, self.board)) and self.current_piece.y > 0:
+                self.current_piece.y -= 1
+                self.change_piece = True
+
+        # Player input
+        for action in actions:
+            if action == 'left':
+                self.move(dx=-1)
+            elif action == 'right':
+                self.move(dx=1)
+            elif action == 'down':
+                self.move(dy=1)
+            elif action == 'rotate':
+                self.move(rotation=1)
+
+        # Check if piece should lock in place
+        if self.change_piece:
+            self.board.lock(convert_shape_format(self.current_piece), self.current_piece.color)
+            self.pieces_placed += 1
+            self.current_piece = self.next_piece
+            self.next_piece = get_shape(self.rng)
+            self.change_piece = False
+            # Clear rows and update score
+            cleared = clear_rows(self.board)
+            if cleared:
+                self.lines_cleared += cleared
+                self.score += cleared * 10
+
+        # Check for game over
+        if check_lost(self.board):
+            self.over = True
+
+def run_headless(policy, max_frames=100000, seed=None, fall_speed=0.5):
+    """Play a game without a window; policy(game) returns each frame's actions."""
+    game = TetrisGame(seed, fall_speed)
+    while not game.over and game.frame < max_frames:
+        game.step(policy(game))
+    return game
+
+def main(win):
+    """Main game loop."""
+    game = TetrisGame()
+    clock = pygame.time.Clock()
+    renderer = Renderer(win, game.board)
+
+    while not game.over:
+        elapsed = clock.tick(FPS)
 
         # Event handling
+        actions = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                run = False
                 pygame.display.quit()
                 quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    current_piece.x -= 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x +=1
-                elif event.key == pygame.K_RIGHT:
-                    current_piece.x +=1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x -=1
-                elif event.key == pygame.K_DOWN:
-                    current_piece.y +=1
-                    if not valid_space(current_piece, grid):
-                        current_piece.y -=1
-                elif event.key == pygame.K_UP:
-                    current_piece.rotation +=1
-                    if not valid_space(current_piece, grid):
-                        current_piece.rotation -=1
-
-        shape_pos = convert_shape_format(current_piece)
-
-        # Add piece to grid
-        for pos in shape_pos:
-            x, y = pos
-            if y > -1:
-                grid[y][x] = current_piece.color
+            if event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+                actions.append(KEY_ACTIONS[event.key])
 
-        # Check if piece should lock in place
-        if change_piece:
-            for pos in shape_pos:
-                locked_positions[(pos[0], pos[1])] = current_piece.color
-            current_piece = next_piece
-            next_piece = get_shape()
-            change_piece = False
-            # Clear rows and update score
-            cleared = clear_rows(grid, locked_positions)
-            if cleared:
-                score += cleared * 10
+        game.step(actions, elapsed)
 
-        draw_window(win, grid, score)
-        draw_next_shape(next_piece, win)
-        pygame.display.update()
+        piece = game.current_piece
+        renderer.draw(game.board, convert_shape_format(piece), piece.color, game.score, game.next_piece)
 
-        # Check for game over
-        if check_lost(locked_positions):
-            draw_text_middle(win, "GAME OVER", 80, (255, 255, 255))
-            pygame.display.update()
-            pygame.time.delay(2000)
-            run = False
+    draw_text_middle(win, "GAME OVER", 80, (255, 255, 255))
+    pygame.display.update()
+    pygame.time.delay(2000)
 
 def main_menu():
-    """Display the main menu."""
-    global win
+    """Display the main menu over a game played by the bot."""
+    pygame.init()
     win = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption('Tetris by ChatGPT')
+    clock = pygame.time.Clock()
+    bot = tetris_ai.TetrisAI()
+    demo = None
     run = True
     while run:
-        win.fill((0, 0, 0))
-        draw_text_middle(win, 'Press Any Key To Play', 60, (255, 255, 255))
-        pygame.display.update()
+        clock.tick(FPS)
+        # Attract mode; a new demo game starts when the last one ends
+        if demo is None or demo.over:
+            demo = TetrisGame()
+            renderer = Renderer(win, demo.board)
+        demo.step(bot.policy(demo))
+        piece = demo.current_piece
+        renderer.draw(demo.board, convert_shape_format(piece), piece.color, demo.score, demo.next_piece)
+        pygame.display.update(draw_text_middle(win, 'Press Any Key To Play', 60, (255, 255, 255)))
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run=False
             if event.type == pygame.KEYDOWN:
-                main()
+                main(win)
+                demo = None
+    text_cache.clear()
     pygame.quit()
 
 if __name__ == '__main__':
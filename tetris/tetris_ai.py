@@ -0,0 +1,228 @@
+"""Placement search for Tetris, used by attract mode and the batch runner.
+
+For each new piece the bot tries every rotation and column of the current
+piece and scores the resulting boards with a heuristic (aggregate height,
+holes, bumpiness and lines cleared). The best few are searched again with
+every placement of the next piece, and the best two-piece board decides
+where the current piece goes.
+
+Boards are searched as tuples of row bitmasks, the same layout as
+tetris.Board.rows, so dropping a piece is a few shifts and ors per row.
+Pieces are dropped straight down from the spawn row, which is where the bot
+steers them before soft-dropping.
+"""
+
+# Heuristic weights; positive terms are rewarded, negative ones penalised
+WEIGHTS = {
+    'height': -0.510066,
+    'lines': 0.760666,
+    'holes': -0.35663,
+    'bumpiness': -0.184483,
+}
+
+# Board evaluations kept between pieces
+EVAL_CACHE_SIZE = 1 << 16
+
+# Best single-piece drops searched again with the next piece; None searches all
+BEAM_WIDTH = 4
+
+# Row the game spawns pieces at
+SPAWN_Y = 0
+
+def column_heights(rows, width):
+    """Height of the highest block in each column, counted from the floor."""
+    height = len(rows)
+    full_row = (1 << width) - 1
+    heights = [0] * width
+    seen = 0
+    for i, row in enumerate(rows):
+        # Columns whose highest block is in this row
+        new = row & ~seen
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = height - i
+            new ^= low
+        seen |= row
+        if seen == full_row:
+            break
+    return heights
+
+class EvaluationCache:
+    """Board evaluations keyed by the board's row tuple, least recently used evicted.
+
+    Python dicts keep insertion order, so a hit is moved to the end and the
+    oldest half is dropped whenever the cache fills up.
+    """
+    def __init__(self, capacity=EVAL_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entries = self.entries
+        value = entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entries[key] = value
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.capacity:
+            items = list(entries.items())
+            self.entries = dict(items[len(items) // 2:])
+
+class Drop:
+    """One rotation of a piece at one column, with its masks shifted into place."""
+    __slots__ = ('rotation', 'x', 'masks', 'bottoms', 'tops')
+
+    def __init__(self, rotation_index, rotation, x):
+        self.rotation = rotation_index
+        self.x = x
+        left = x + rotation.min_x
+        self.masks = tuple((dy, mask << left) for dy, mask in rotation.row_masks)
+        # Lowest and highest row offsets of the piece in each board column it covers
+        bottoms = {}
+        tops = {}
+        for dx, dy in rotation.cells:
+            bottoms[x + dx] = max(dy, bottoms.get(x + dx, dy))
+            tops[x + dx] = min(dy, tops.get(x + dx, dy))
+        self.bottoms = tuple(bottoms.items())
+        self.tops = tuple(tops.items())
+
+class TetrisAI:
+    """Chooses placements by two-piece lookahead and steers pieces to them.
+
+    Call policy(game) once per frame, as run_headless does; it returns the
+    frame's actions and searches again whenever a new piece spawns.
+    """
+    def __init__(self, weights=None, cache_size=EVAL_CACHE_SIZE, lookahead=True, beam=BEAM_WIDTH):
+        self.weights = dict(WEIGHTS, **(weights or {}))
+        self.cache = EvaluationCache(cache_size)
+        self.lookahead = lookahead
+        self.beam = beam
+        self.drops = {}  # (rotations table, board width) -> [Drop]
+        self.piece = None
+        self.target = None
+
+    def drops_for(self, rotations, width):
+        """Every rotation and column the piece can be dropped in, built once per shape."""
+        key = (rotations, width)
+        drops = self.drops.get(key)
+        if drops is None:
+            drops = self.drops[key] = [
+                Drop(index, rotation, x)
+                for index, rotation in enumerate(rotations)
+                for x in range(-rotation.min_x, width - rotation.max_x)
+            ]
+        return drops
+
+    def evaluate(self, rows, width, heights=None):
+        """Return (score, column heights) of a board, using the cache.
+
+        heights may be passed in when the caller already knows them.
+        """
+        cached = self.cache.get(rows)
+        if cached is not None:
+            return cached
+        if heights is None:
+            heights = column_heights(rows, width)
+        # Every empty cell below a column's highest block is a hole
+        aggregate = sum(heights)
+        holes = aggregate - sum(map(int.bit_count, rows))
+        bumpiness = sum(map(abs, map(int.__sub__, heights, heights[1:])))
+        weights = self.weights
+        score = (
+            weights['height'] * aggregate +
+            weights['holes'] * holes +
+            weights['bumpiness'] * bumpiness
+        )
+        result = (score, heights)
+        self.cache.put(rows, result)
+        return result
+
+    def placements(self, rows, heights, rotations, width, full_row):
+        """Yield (drop, rows after, lines cleared, heights after) for each surviving drop.
+
+        The heights are None when lines were cleared and must be recounted.
+        """
+        height = len(rows)
+        for drop in self.drops_for(rotations, width):
+            # The piece stops on the highest block of any column it covers
+            y = min(height - heights[column] - 1 - bottom for column, bottom in drop.bottoms)
+            if y < SPAWN_Y:
+                continue
+            after = list(rows)
+            cleared = 0
+            for dy, mask in drop.masks:
+                if y + dy < 0:
+                    break
+                after[y + dy] |= mask
+                if after[y + dy] == full_row:
+                    cleared += 1
+            else:
+                if cleared:
+                    after = [row for row in after if row != full_row]
+                    after[:0] = [0] * cleared
+                    after_heights = None
+                else:
+                    after_heights = list(heights)
+                    for column, top in drop.tops:
+                        after_heights[column] = max(after_heights[column], height - y - top)
+                # Anything left in the top row ends the game (see check_lost)
+                if after[0]:
+                    continue
+                yield drop, tuple(after), cleared, after_heights
+
+    def choose(self, board, piece, next_piece=None):
+        """Return the best Drop for piece on board, or None if every drop loses."""
+        width = board.width
+        full_row = board.full_row
+        line_weight = self.weights['lines']
+        rows = tuple(board.rows)
+        _, heights = self.evaluate(rows, width)
+        candidates = []
+        for drop, after, cleared, after_heights in self.placements(rows, heights, piece.rotations, width, full_row):
+            score, after_heights = self.evaluate(after, width, after_heights)
+            candidates.append((score + line_weight * cleared, drop, after, after_heights, cleared))
+        if not candidates:
+            return None
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        if next_piece is None or not self.lookahead:
+            return candidates[0][1]
+
+        # Score the most promising drops by the best follow-up of the next piece
+        best = None
+        best_score = None
+        for _, drop, after, after_heights, cleared in candidates[:self.beam]:
+            for _, final, final_cleared, final_heights in self.placements(
+                    after, after_heights, next_piece.rotations, width, full_row):
+                score = self.evaluate(final, width, final_heights)[0] + line_weight * (cleared + final_cleared)
+                if best_score is None or score > best_score:
+                    best, best_score = drop, score
+        # If every follow-up loses, place the current piece as well as possible anyway
+        return best or candidates[0][1]
+
+    def policy(self, game):
+        """Return this frame's actions: rotate, then shift, then soft-drop into place."""
+        piece = game.current_piece
+        if piece is not self.piece:
+            self.piece = piece
+            self.target = self.choose(game.board, piece, game.next_piece)
+        target = self.target
+        if target is None:
+            return ['down']
+        if piece.rotation % len(piece.rotations) != target.rotation:
+            return ['rotate']
+        if piece.x > target.x:
+            return ['left']
+        if piece.x < target.x:
+            return ['right']
+        return ['down']
@@ -0,0 +1,106 @@
+"""Run many seeded headless Tetris games in parallel and summarise them.
+
+    python tetris_batch.py --games 200 --policy bot --fall-speed 0.4
+
+Each game is tetris.run_headless with its own seed, so the rules are the
+game's own. Policies are named in POLICIES or given as module:function,
+where the function takes the game's seed and returns a policy(game)
+callable; workers build their own policy, so it never has to be pickled.
+"""
+import argparse
+import importlib
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tetris
+import tetris_ai
+
+# Actions a random policy picks from; None does nothing that frame
+RANDOM_ACTIONS = ('left', 'right', 'down', 'rotate', None)
+
+def bot_policy(seed):
+    return tetris_ai.TetrisAI().policy
+
+def random_policy(seed):
+    rng = random.Random(seed)
+    def policy(game):
+        action = rng.choice(RANDOM_ACTIONS)
+        return [action] if action else []
+    return policy
+
+def drop_policy(seed):
+    return lambda game: ['down']
+
+# Policy factories by name
+POLICIES = {
+    'bot': bot_policy,
+    'random': random_policy,
+    'drop': drop_policy,
+}
+
+def load_policy(name):
+    """Return the policy factory called name, or imported from 'module:function'."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module, _, attr = name.partition(':')
+    if not attr:
+        raise ValueError(f'unknown policy {name!r}; use one of {", ".join(POLICIES)} or module:function')
+    return getattr(importlib.import_module(module), attr)
+
+def play(policy_name, seed, max_frames, fall_speed):
+    """Play one game in a worker and return its statistics."""
+    start = time.perf_counter()
+    game = tetris.run_headless(load_policy(policy_name)(seed), max_frames, seed, fall_speed)
+    return {
+        'seed': seed,
+        'score': game.score,
+        'lines': game.lines_cleared,
+        'pieces': game.pieces_placed,
+        'frames': game.frame,
+        'topped_out': game.over,
+        'seconds': time.perf_counter() - start,
+    }
+
+def run_batch(games, policy='bot', seed=0, max_frames=100000, fall_speed=0.5, workers=None):
+    """Play games seeded seed, seed + 1, ... across worker processes; return their results."""
+    load_policy(policy)  # fail here rather than in every worker
+    seeds = range(seed, seed + games)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            play, [policy] * games, seeds, [max_frames] * games, [fall_speed] * games
+        ))
+
+def summarise(results):
+    """Return per-statistic (mean, stdev, min, max) rows for a list of results."""
+    summary = {}
+    for key in ('score', 'lines', 'pieces', 'frames'):
+        values = [result[key] for result in results]
+        spread = statistics.stdev(values) if len(values) > 1 else 0.0
+        summary[key] = (statistics.mean(values), spread, min(values), max(values))
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Run seeded headless Tetris games in parallel')
+    parser.add_argument('--games', type=int, default=16, help='number of games to play')
+    parser.add_argument('--policy', default='bot', help=f'{", ".join(POLICIES)} or module:function')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--max-frames', type=int, default=100000, help='frames before a game is stopped')
+    parser.add_argument('--fall-speed', type=float, default=0.5, help='starting seconds per row')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(args.games, args.policy, args.seed, args.max_frames, args.fall_speed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    topped_out = sum(result['topped_out'] for result in results)
+    print(f'{len(results)} games, policy {args.policy}, fall speed {args.fall_speed}, '
+          f'{topped_out} topped out, {elapsed:.1f}s')
+    print(f'{"":8}{"mean":>10}{"stdev":>10}{"min":>8}{"max":>8}')
+    for key, (mean, spread, low, high) in summarise(results).items():
+        print(f'{key:8}{mean:10.1f}{spread:10.1f}{low:8}{high:8}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Cached fonts and rendered text shared by the games.
+
+pygame.font.SysFont searches the system fonts on every call and rendering a
+label allocates a new surface, so both are cached here: fonts by
+(name, size, bold) and rendered labels by font, text and color. Games live in
+their own folders and add the repository root to sys.path to import this.
+"""
+import functools
+
+import pygame
+
+# Rendered labels kept; scores change often, so old values are evicted
+LABEL_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=None)
+def get_font(name, size, bold=False):
+    """Return the system font for (name, size, bold), creating it once."""
+    return pygame.font.SysFont(name, size, bold=bold)
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _render(name, size, bold, text, color, antialias):
+    return get_font(name, size, bold).render(text, antialias, color)
+
+def render(text, name, size, color, bold=False, antialias=True):
+    """Return a rendered label; it is shared with other callers, so do not draw on it."""
+    return _render(name, size, bold, text, tuple(color), antialias)
+
+def clear():
+    """Forget every cached font and label, e.g. after pygame.quit()."""
+    get_font.cache_clear()
+    _render.cache_clear()